@@ -52,6 +52,8 @@ class SamplingConfigXML:
                 <number_of_samples></number_of_samples>
                 <frequency_min></frequency_min>
                 <frequency_max></frequency_max>
+                <settle_tolerance></settle_tolerance>
+                <settle_timeout></settle_timeout>
             </plot>
             """
         )
@@ -68,6 +70,8 @@ class SamplingConfigXML:
         number_of_samples: Optional[int] = None
         frequency_min: Optional[float] = None
         frequency_max: Optional[float] = None
+        settle_tolerance: Optional[float] = None
+        settle_timeout: Optional[float] = None
 
         if dictionary is not None:
             Fs_multiplier = dictionary.get("Fs_multiplier", None)
@@ -75,6 +79,8 @@ class SamplingConfigXML:
             number_of_samples = dictionary.get("number_of_samples", None)
             frequency_min = dictionary.get("frequency_min", None)
             frequency_max = dictionary.get("frequency_max", None)
+            settle_tolerance = dictionary.get("settle_tolerance", None)
+            settle_timeout = dictionary.get("settle_timeout", None)
 
             if Fs_multiplier:
                 Fs_multiplier = float(Fs_multiplier)
@@ -91,12 +97,20 @@ class SamplingConfigXML:
             if frequency_max:
                 frequency_max = float(frequency_max)
 
+            if settle_tolerance:
+                settle_tolerance = float(settle_tolerance)
+
+            if settle_timeout:
+                settle_timeout = float(settle_timeout)
+
         return cls.from_values(
             Fs_multiplier=Fs_multiplier,
             points_per_decade=points_per_decade,
             number_of_samples=number_of_samples,
             frequency_min=frequency_min,
             frequency_max=frequency_max,
+            settle_tolerance=settle_tolerance,
+            settle_timeout=settle_timeout,
         )
 
     @classmethod
@@ -107,6 +121,8 @@ class SamplingConfigXML:
         number_of_samples: Optional[int] = None,
         frequency_min: Optional[float] = None,
         frequency_max: Optional[float] = None,
+        settle_tolerance: Optional[float] = None,
+        settle_timeout: Optional[float] = None,
     ):
         tree = cls._tree
 
@@ -125,6 +141,12 @@ class SamplingConfigXML:
         if frequency_max:
             tree.find("./frequency_max").text = str(frequency_max)
 
+        if settle_tolerance:
+            tree.find("./settle_tolerance").text = str(settle_tolerance)
+
+        if settle_timeout:
+            tree.find("./settle_timeout").text = str(settle_timeout)
+
         return cls(tree)
 
     def get_node(self):
@@ -180,6 +202,24 @@ class SamplingConfigXML:
 
         return frequency_max
 
+    @property
+    def settle_tolerance(self):
+        settle_tolerance = self._tree.find("./settle_tolerance").text
+
+        if settle_tolerance is not None:
+            settle_tolerance = float(settle_tolerance)
+
+        return settle_tolerance
+
+    @property
+    def settle_timeout(self):
+        settle_timeout = self._tree.find("./settle_timeout").text
+
+        if settle_timeout is not None:
+            settle_timeout = float(settle_timeout)
+
+        return settle_timeout
+
     def override(
         self,
         Fs_multiplier: Optional[float] = None,
@@ -187,6 +227,8 @@ class SamplingConfigXML:
         number_of_samples: Optional[int] = None,
         frequency_min: Optional[float] = None,
         frequency_max: Optional[float] = None,
+        settle_tolerance: Optional[float] = None,
+        settle_timeout: Optional[float] = None,
     ):
         console.print(
             Fs_multiplier,
@@ -194,6 +236,8 @@ class SamplingConfigXML:
             number_of_samples,
             frequency_min,
             frequency_max,
+            settle_tolerance,
+            settle_timeout,
         )
 
         if Fs_multiplier is not None:
@@ -211,6 +255,12 @@ class SamplingConfigXML:
         if frequency_max is not None:
             self._set_frequency_max(frequency_max)
 
+        if settle_tolerance is not None:
+            self._set_settle_tolerance(settle_tolerance)
+
+        if settle_timeout is not None:
+            self._set_settle_timeout(settle_timeout)
+
     def _set_Fs_multiplier(self, Fs_multiplier: Optional[float]):
         self._tree.find("./Fs_multiplier").text = str(Fs_multiplier)
 
@@ -225,3 +275,9 @@ class SamplingConfigXML:
 
     def _set_frequency_max(self, frequency_max: Optional[float]):
         self._tree.find("./frequency_max").text = str(frequency_max)
+
+    def _set_settle_tolerance(self, settle_tolerance: Optional[float]):
+        self._tree.find("./settle_tolerance").text = str(settle_tolerance)
+
+    def _set_settle_timeout(self, settle_timeout: Optional[float]):
+        self._tree.find("./settle_timeout").text = str(settle_timeout)
@@ -1,5 +1,5 @@
 import math
-from typing import List, Optional, Tuple
+from typing import List, Tuple
 
 import numpy as np
 
@@ -18,119 +18,86 @@ def decimal_decompose(x) -> Tuple[float, int]:
     return mantissa, exponent
 
 
+def zero_crossings(sample: np.ndarray) -> np.ndarray:
+    """Indices `i` where the sign changes strictly between `sample[i]` and
+    `sample[i + 1]`, exact zeros are not crossings.
+    """
+    return np.flatnonzero(sample[:-1] * sample[1:] < 0)
+
+
+def nearest_to_zero(sample: np.ndarray, crossings: np.ndarray) -> np.ndarray:
+    """For every crossing the index, between `i` and `i + 1`, nearest to zero,
+    `i` on a tie.
+    """
+    return np.where(
+        np.abs(sample[crossings + 1]) < np.abs(sample[crossings]),
+        crossings + 1,
+        crossings,
+    )
+
+
 def find_sin_zero_offset(sample: List[float]) -> Tuple[List[float], int, int]:
-    # console.print(f"[Sample] - N: {len(sample)}")
-
-    found: bool = False
-    start_found: bool = False
-    end_found: bool = False
-
-    index_start: int = 0
-    index_end: int = len(sample)
-
-    start_cycle_slope: Optional[float] = 0
-    end_cycle_slope: Optional[float] = 0
-
-    # From start to end
-    for n in range(1, len(sample)):
-        samp_curr_index = n
-        samp_prev_index = n - 1
-        samp_curr = sample[samp_curr_index]
-        samp_prev = sample[samp_prev_index]
-        slope = samp_curr - samp_prev
-
-        norm: float = (samp_prev * samp_curr) / np.abs(samp_prev * samp_curr)
-
-        if norm < 0:
-            start_cycle_slope = slope
-            index_start = (
-                samp_curr_index
-                if np.abs(samp_curr) < np.abs(samp_prev)
-                else samp_prev_index
-            )
-            # console.print(f"[Sample] - Index Start: {index_start}")
-
-            start_found = True
-            break
+    values = np.asarray(sample, dtype=float)
+
+    crossings = zero_crossings(values)
 
-    if not start_found:
+    if len(crossings) == 0:
         return []
 
-    # From end to start
-    # len - 2 = index(-2) of array
-    for n in range(len(sample) - 2, -1, -1):
-        samp_curr_index = n
-        samp_prev_index = n + 1
-        samp_curr = sample[samp_curr_index]
-        samp_prev = sample[samp_prev_index]
-        slope = samp_curr - samp_prev
-
-        norm: float = (samp_prev * samp_curr) / np.abs(samp_prev * samp_curr)
-
-        if norm < 0:
-            end_cycle_slope = slope
-
-            if start_cycle_slope * end_cycle_slope < 0:
-                index_end = (
-                    samp_curr_index
-                    if np.abs(samp_curr) < np.abs(samp_prev)
-                    else samp_prev_index
-                )
-                # console.print(f"[Sample] - Index End: {index_end}")
-                end_found = True
-                found = True
-                break
-            else:
-                continue
+    slopes = values[crossings + 1] - values[crossings]
 
-    if not end_found:
-        return []
+    # The last crossing with the same slope direction of the first one
+    same_slope = crossings[slopes * slopes[0] > 0]
 
-    if found:
-        # console.print(f"[Sample] - Index: {index_start:4} - {index_end:4}")
+    index_start = int(nearest_to_zero(values, crossings[:1])[0])
 
-        if index_end - index_start > 1:
-            return sample[index_start:index_end], index_start, index_end
-        else:
-            return []
+    # Walking backward, on a tie the sample after the crossing is kept
+    end = same_slope[-1]
+    index_end = int(end if np.abs(values[end]) < np.abs(values[end + 1]) else end + 1)
+
+    if index_end - index_start > 1:
+        return sample[index_start:index_end], index_start, index_end
     else:
         return []
 
 
 def rms_full_cycle(sample: List[float]) -> List[float]:
-    from audio.math.rms import RMS
+    values = np.asarray(sample, dtype=float)
 
-    rms_fft_cycle_list: List[float] = []
+    start_slope = values[1] - values[0]
 
-    start_slope = sample[1] - sample[0]
-    last_slope = 0
+    crossings = zero_crossings(values)
+    crossings = crossings[crossings >= 1]
 
-    # From start to end
-    for n in range(2, len(sample)):
-        samp_curr_index = n
-        samp_prev_index = n - 1
-        samp_curr = sample[samp_curr_index]
-        samp_prev = sample[samp_prev_index]
+    slopes = values[crossings + 1] - values[crossings]
+    same_slope = slopes * start_slope > 0
 
-        slope = samp_curr - samp_prev
+    # RMS of every prefix `sample[0:index]` from the cumulative sum of squares
+    indices = nearest_to_zero(values, crossings[same_slope])
+    cumulative_power = np.cumsum(np.square(values))
 
-        norm: float = (samp_prev * samp_curr) / np.abs(samp_prev * samp_curr)
+    rms_fft_cycle_list: List[float] = np.sqrt(
+        cumulative_power[indices - 1] / indices
+    ).tolist()
 
-        if norm < 0 and start_slope * slope > 0:
-            last_slope = slope
-            index = (
-                samp_curr_index
-                if np.abs(samp_curr) < np.abs(samp_prev)
-                else samp_prev_index
-            )
-            rms_fft_cycle_list.append(RMS.fft(sample[0:index]))
+    last_slope = slopes[same_slope][-1] if np.any(same_slope) else 0
 
     if start_slope * last_slope < -1:
-        rms_fft_cycle_list.append(RMS.fft(sample))
+        rms_fft_cycle_list.append(float(np.sqrt(cumulative_power[-1] / len(values))))
 
     return rms_fft_cycle_list
 
 
+def rms_prefixes(sample: List[float], lengths) -> np.ndarray:
+    """RMS of every prefix `sample[0:n]` for `n` in `lengths`, the same value
+    of `RMS.fft` on the prefix, from one cumulative sum of squares in O(N).
+    """
+    lengths = np.asarray(lengths, dtype=int)
+    cumulative_power = np.cumsum(np.square(np.asarray(sample, dtype=float)))
+
+    return np.sqrt(cumulative_power[lengths - 1] / lengths)
+
+
 def percentage_error(exact: float, approx: float) -> float:
     return (approx - exact) / exact
 
@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
+from audio.utility import trim_value
+
 
 class LogarithmicScale:
     min_Hz: float
@@ -33,3 +35,102 @@ class LogarithmicScale:
         )
 
         self.f_list = [np.float_power(10, f) for f in self.f_log_list]
+
+    def missing(self, frequencies: List[float]) -> np.ndarray:
+        """Mask of the frequencies of `f_list` not in `frequencies`, the
+        gaps of an interrupted sweep included.
+
+        A frequency matches when it's nearer than a quarter of the
+        logarithmic step, so the nudged frequencies of a coherent sweep
+        still match.
+        """
+        if len(frequencies) == 0:
+            return np.ones(len(self.f_log_list), dtype=bool)
+
+        tolerance = 0.25 / self.points_per_decade
+        done = np.log10(np.asarray(frequencies, dtype=float))
+
+        distance = np.abs(np.subtract.outer(self.f_log_list, done))
+
+        return np.min(distance, axis=1) >= tolerance
+
+
+class CoherentPoint:
+    frequency: float
+    generator_frequency: float
+    Fs: float
+    number_of_samples: int
+    n_periods: int
+
+    def __init__(
+        self,
+        frequency: float,
+        generator_frequency: float,
+        Fs: float,
+        number_of_samples: int,
+        n_periods: int,
+    ) -> None:
+        self.frequency = frequency
+        self.generator_frequency = generator_frequency
+        self.Fs = Fs
+        self.number_of_samples = number_of_samples
+        self.n_periods = n_periods
+
+    @property
+    def oversampling_ratio(self) -> float:
+        return self.Fs / self.generator_frequency
+
+
+class CoherentPlanner:
+    """Plans every point of the sweep so that the capture holds an integer
+    number of periods. The number of samples is rounded to the nearest
+    whole number of periods and the generator frequency is nudged by the
+    remaining fraction of sample, at most 0.5 / number_of_samples.
+    """
+
+    Fs_multiplier: float
+    Fs_max: float
+
+    def __init__(self, Fs_multiplier: float, Fs_max: float) -> None:
+        self.Fs_multiplier = Fs_multiplier
+        self.Fs_max = Fs_max
+
+    def plan(
+        self,
+        frequency: float,
+        number_of_samples: int,
+        Fs: Optional[float] = None,
+    ) -> CoherentPoint:
+        """
+        Args:
+            frequency (float): The target frequency
+            number_of_samples (int): The wanted number of samples
+            Fs (Optional[float], optional): The sampling rate, if already fixed
+                (e.g. coerced by the device). Defaults to Fs_multiplier * frequency
+                up to Fs_max.
+
+        Returns:
+            CoherentPoint: The planned point
+        """
+        if Fs is None:
+            Fs = trim_value(frequency * self.Fs_multiplier, max_value=self.Fs_max)
+
+        samples_per_period = Fs / frequency
+
+        n_periods = max(1, int(round(number_of_samples / samples_per_period)))
+        n_samples = max(1, int(round(n_periods * samples_per_period)))
+
+        return CoherentPoint(
+            frequency=frequency,
+            generator_frequency=n_periods * Fs / n_samples,
+            Fs=Fs,
+            number_of_samples=n_samples,
+            n_periods=n_periods,
+        )
+
+    def plan_scale(
+        self,
+        log_scale: LogarithmicScale,
+        number_of_samples: int,
+    ) -> List[CoherentPoint]:
+        return [self.plan(f, number_of_samples) for f in log_scale.f_list]
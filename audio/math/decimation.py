@@ -0,0 +1,58 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def min_max_decimate(
+    x: np.ndarray,
+    y: np.ndarray,
+    width: int,
+    points_per_pixel: float = 4,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Level of detail for a line plot `width` pixels wide.
+
+    The samples are split in `width` buckets, one per pixel column, and
+    only the minimum and the maximum of every bucket are kept, in time
+    order: every peak is still drawn, with at most `2 * width` points
+    whatever the number of samples. The first and the last sample are kept.
+
+    Up to `points_per_pixel * width` samples the curve is returned as it is.
+
+    Args:
+        x (np.ndarray): The x coordinates, e.g. the time
+        y (np.ndarray): The values
+        width (int): The width of the plot in pixels
+        points_per_pixel (float, optional): The density above which the
+            curve is decimated.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The x and y of the points kept
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    n = len(y)
+
+    if width < 1 or n <= points_per_pixel * width:
+        return x, y
+
+    size = int(np.ceil(n / width))
+    full = (n // size) * size
+
+    # One row per bucket, the partial last bucket apart
+    buckets = y[:full].reshape(-1, size)
+    offsets = np.arange(0, full, size)
+
+    indexes = [
+        [0, n - 1],
+        buckets.argmin(axis=1) + offsets,
+        buckets.argmax(axis=1) + offsets,
+    ]
+
+    if full < n:
+        indexes.append([full + y[full:].argmin(), full + y[full:].argmax()])
+
+    # Sorted and without the duplicates, e.g. a flat bucket
+    index = np.unique(np.concatenate(indexes))
+
+    return x[index], y[index]
@@ -0,0 +1,124 @@
+from typing import List, Optional
+
+import numpy as np
+from scipy.fft import irfft, rfft, rfftfreq
+
+
+def exponential_sine_sweep(
+    f_start: float,
+    f_stop: float,
+    duration: float,
+    Fs: float,
+    silence: float = 0.1,
+    fade: float = 0.01,
+) -> np.ndarray:
+    """Farina Exponential Sine Sweep, normalized between -1 and 1.
+
+    Args:
+        f_start (float): Start frequency of the sweep
+        f_stop (float): Stop frequency of the sweep
+        duration (float): Duration of the sweep [s]
+        Fs (float): Sampling rate
+        silence (float, optional): Trailing silence, relative to the duration.
+        fade (float, optional): Fade in and fade out, relative to the duration.
+
+    Returns:
+        np.ndarray: The sweep samples followed by the silence
+    """
+    n_sweep = int(round(duration * Fs))
+    t = np.arange(n_sweep) / Fs
+
+    rate = duration / np.log(f_stop / f_start)
+    sweep = np.sin(2 * np.pi * f_start * rate * (np.exp(t / rate) - 1))
+
+    n_fade = int(round(fade * n_sweep))
+    if n_fade > 0:
+        fade_in = np.hanning(2 * n_fade)[:n_fade]
+        sweep[:n_fade] *= fade_in
+        sweep[-n_fade:] *= fade_in[::-1]
+
+    return np.concatenate((sweep, np.zeros(int(round(silence * n_sweep)))))
+
+
+def ess_impulse_response(
+    response: np.ndarray,
+    reference: np.ndarray,
+    regularization: float = 1e-6,
+) -> np.ndarray:
+    """Deconvolves one period of the looped sweep.
+
+    The generator plays the sweep in loop and the capture starts anywhere in
+    the loop, so the deconvolution is circular and the impulse response is
+    rotated by the unknown capture delay.
+
+    Args:
+        response (np.ndarray): Exactly one period of the captured loop
+        reference (np.ndarray): The played sweep, in Volts
+        regularization (float, optional): Relative floor of the inverse filter
+            where the sweep has no energy.
+
+    Returns:
+        np.ndarray: The (rotated) impulse response
+    """
+    if len(response) != len(reference):
+        raise ValueError("The response must be one period of the reference.")
+
+    X = rfft(reference)
+    Y = rfft(response)
+
+    power = np.abs(X) ** 2
+
+    H = Y * np.conj(X) / (power + regularization * np.max(power))
+
+    return irfft(H, len(reference))
+
+
+def ess_frequency_response(
+    response: np.ndarray,
+    reference: np.ndarray,
+    Fs: float,
+    frequencies: List[float],
+    ir_length: Optional[int] = None,
+    pre_delay: Optional[int] = None,
+) -> np.ndarray:
+    """Magnitude of the frequency response at every frequency.
+
+    The impulse response is moved to start at `pre_delay` and windowed to
+    `ir_length`, the harmonic distortion products of the exponential sweep
+    fall before the linear response and are cut out by the window.
+
+    Args:
+        response (np.ndarray): Exactly one period of the captured loop
+        reference (np.ndarray): The played sweep, in Volts
+        Fs (float): Sampling rate
+        frequencies (List[float]): Frequencies where to evaluate the response
+
+    Returns:
+        np.ndarray: The linear gain at every frequency
+    """
+    n = len(reference)
+
+    if ir_length is None:
+        ir_length = n // 2
+
+    if pre_delay is None:
+        pre_delay = max(1, int(0.001 * Fs))
+
+    impulse_response = ess_impulse_response(response, reference)
+
+    # Aligns the main peak at `pre_delay`
+    peak = int(np.argmax(np.abs(impulse_response)))
+    impulse_response = np.roll(impulse_response, pre_delay - peak)
+
+    n_fade_out = ir_length // 4
+
+    window = np.zeros(n)
+    window[:pre_delay] = np.hanning(2 * pre_delay)[:pre_delay]
+    window[pre_delay:ir_length] = 1
+    window[ir_length - n_fade_out : ir_length] = np.hanning(2 * n_fade_out)[
+        n_fade_out:
+    ]
+
+    magnitude = np.abs(rfft(impulse_response * window))
+
+    return np.interp(frequencies, rfftfreq(n, 1 / Fs), magnitude)
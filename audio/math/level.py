@@ -0,0 +1,94 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Amplitude limits of the generator [Vpp]
+GENERATOR_MIN_AMPLITUDE: float = 0.001
+GENERATOR_MAX_AMPLITUDE: float = 10
+
+
+class LevelSolver:
+    """Predicts the generator amplitude that gives the `target` RMS at the
+    DUT output.
+
+    The first step uses the linear gain `rms / amplitude` measured at the
+    start. The next ones refine it with the secant of the last two
+    measurements, or the linear gain of the last one when the secant is not
+    usable, bounded to `max_step` times the current amplitude. Every
+    amplitude is bounded to the generator limits.
+
+    When the error stops decreasing, or after `max_iterations` steps,
+    `next_amplitude` returns None and the caller falls back to the PID.
+    """
+
+    target: float
+    min_amplitude: float
+    max_amplitude: float
+    max_step: float
+    max_iterations: int
+
+    _points: List[Tuple[float, float]]
+
+    def __init__(
+        self,
+        target: float,
+        min_amplitude: float = GENERATOR_MIN_AMPLITUDE,
+        max_amplitude: float = GENERATOR_MAX_AMPLITUDE,
+        max_step: float = 2,
+        max_iterations: int = 5,
+    ) -> None:
+        self.target = target
+        self.min_amplitude = min_amplitude
+        self.max_amplitude = max_amplitude
+        self.max_step = max_step
+        self.max_iterations = max_iterations
+
+        self._points = []
+
+    @property
+    def iterations(self) -> int:
+        return len(self._points)
+
+    def error(self, rms: float) -> float:
+        return self.target - rms
+
+    def next_amplitude(self, amplitude: float, rms: float) -> Optional[float]:
+        """
+        Args:
+            amplitude (float): The generator amplitude of the measurement
+            rms (float): The measured RMS
+
+        Returns:
+            Optional[float]: The next amplitude, None if the solver failed
+        """
+        self._points.append((amplitude, rms))
+
+        if self.iterations > self.max_iterations:
+            return None
+
+        if self.iterations > 1:
+            (amplitude_prev, rms_prev), _ = self._points[-2:]
+
+            # Diverging
+            if abs(self.error(rms)) >= abs(self.error(rms_prev)):
+                return None
+
+            slope = (rms - rms_prev) / (amplitude - amplitude_prev)
+        else:
+            slope = np.nan
+
+        # Linear gain through the origin when the secant is not usable
+        if not np.isfinite(slope) or slope <= 0:
+            slope = rms / amplitude
+
+        if not np.isfinite(slope) or slope <= 0:
+            return None
+
+        next_amplitude = amplitude + self.error(rms) / slope
+
+        if self.iterations > 1:
+            next_amplitude = np.clip(
+                next_amplitude, amplitude / self.max_step, amplitude * self.max_step
+            )
+
+        return float(np.clip(next_amplitude, self.min_amplitude, self.max_amplitude))
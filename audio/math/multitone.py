@@ -0,0 +1,153 @@
+from typing import List, Set
+
+import numpy as np
+from scipy.fft import irfft, rfft
+
+
+class Multitone:
+    """Sum of equal amplitude cosines, every tone on an exact FFT bin of a
+    capture of `number_of_samples` at `Fs`, so one capture holds an integer
+    number of periods of every tone.
+    """
+
+    bins: np.ndarray
+    phases: np.ndarray
+    number_of_samples: int
+    Fs: float
+
+    def __init__(
+        self,
+        bins: np.ndarray,
+        phases: np.ndarray,
+        number_of_samples: int,
+        Fs: float,
+    ) -> None:
+        self.bins = np.asarray(bins, dtype=int)
+        self.phases = np.asarray(phases, dtype=float)
+        self.number_of_samples = number_of_samples
+        self.Fs = Fs
+
+    @classmethod
+    def from_frequencies(
+        cls,
+        frequencies: List[float],
+        Fs: float,
+        number_of_samples: int,
+        iterations: int = 50,
+    ):
+        bins = multitone_bins(frequencies, Fs, number_of_samples)
+        phases = optimise_phases(bins, number_of_samples, iterations=iterations)
+
+        return cls(bins, phases, number_of_samples, Fs)
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        return self.bins * self.Fs / self.number_of_samples
+
+    def _waveform(self) -> np.ndarray:
+        return multitone_waveform(self.bins, self.phases, self.number_of_samples)
+
+    def waveform(self) -> np.ndarray:
+        """The multitone normalized to a peak of 1."""
+        waveform = self._waveform()
+        return waveform / np.max(np.abs(waveform))
+
+    @property
+    def amplitude(self) -> float:
+        """Peak amplitude of every tone in the normalized waveform."""
+        return 1 / np.max(np.abs(self._waveform()))
+
+    @property
+    def crest_factor(self) -> float:
+        return crest_factor(self._waveform())
+
+
+def group_frequencies(
+    frequencies: List[float],
+    tones_per_group: int,
+) -> List[List[float]]:
+    """Splits the frequencies in groups, interleaved so that the tones of a
+    group are spread over the whole band.
+    """
+    n_groups = int(np.ceil(len(frequencies) / tones_per_group))
+
+    return [list(frequencies[g::n_groups]) for g in range(n_groups)]
+
+
+def multitone_bins(
+    frequencies: List[float],
+    Fs: float,
+    number_of_samples: int,
+) -> np.ndarray:
+    """Nearest FFT bin of every frequency. A bin already used, or on the 2nd
+    or 3rd harmonic of another tone, is moved to the next free one.
+    """
+    bins: List[int] = []
+    forbidden: Set[int] = set()
+
+    for frequency in sorted(frequencies):
+        k = max(1, int(round(frequency * number_of_samples / Fs)))
+
+        while k in forbidden:
+            k += 1
+
+        if k >= number_of_samples // 2:
+            raise ValueError("The Sampling rate is low: Fs / 2 > frequency.")
+
+        bins.append(k)
+        forbidden.add(k)
+        forbidden.update({b * h for b in bins for h in (2, 3)})
+
+    return np.array(bins, dtype=int)
+
+
+def multitone_waveform(
+    bins: np.ndarray,
+    phases: np.ndarray,
+    number_of_samples: int,
+) -> np.ndarray:
+    spectrum = np.zeros(number_of_samples // 2 + 1, dtype=complex)
+    spectrum[bins] = np.exp(1j * phases) * number_of_samples / 2
+
+    return irfft(spectrum, number_of_samples)
+
+
+def crest_factor(waveform: np.ndarray) -> float:
+    return float(np.max(np.abs(waveform)) / np.sqrt(np.mean(np.square(waveform))))
+
+
+def optimise_phases(
+    bins: np.ndarray,
+    number_of_samples: int,
+    iterations: int = 50,
+    clip: float = 0.8,
+) -> np.ndarray:
+    """Schroeder phases, refined clipping the peaks of the waveform and keeping
+    the phases of the clipped spectrum at the tone bins.
+
+    Returns:
+        np.ndarray: The phases with the lowest crest factor found
+    """
+    n_tones = len(bins)
+    k = np.arange(1, n_tones + 1)
+
+    phases = -np.pi * k * (k - 1) / n_tones
+
+    best_phases = phases
+    best_crest_factor = crest_factor(
+        multitone_waveform(bins, phases, number_of_samples)
+    )
+
+    for _ in range(iterations):
+        waveform = multitone_waveform(bins, phases, number_of_samples)
+
+        limit = clip * np.max(np.abs(waveform))
+        phases = np.angle(rfft(np.clip(waveform, -limit, limit))[bins])
+
+        current = crest_factor(multitone_waveform(bins, phases, number_of_samples))
+
+        if current < best_crest_factor:
+            best_crest_factor = current
+            best_phases = phases
+
+    return best_phases
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Optional
 
 import numpy as np
 
@@ -12,28 +12,81 @@ class Timed_Value:
         self.time = time
 
 
+class ValueLog:
+    """Array backed history of a PID signal, with optional timestamps.
+
+    The arrays are preallocated and doubled when full, so appending is O(1)
+    and the history can be plotted as it is.
+    """
+
+    _values: np.ndarray
+    _times: np.ndarray
+    _size: int
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._values = np.empty(capacity)
+        self._times = np.full(capacity, np.nan)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[: self._size]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[: self._size]
+
+    def append(self, value: float, time: Optional[float] = None):
+        if self._size == len(self._values):
+            self._values = np.resize(self._values, 2 * self._size)
+            self._times = np.resize(self._times, 2 * self._size)
+
+        self._values[self._size] = value
+        self._times[self._size] = np.nan if time is None else time
+        self._size += 1
+
+    def last_step(self) -> float:
+        """Time between the last two values, 1 without timestamps."""
+        if self._size < 2:
+            return 0
+
+        step = self._times[self._size - 1] - self._times[self._size - 2]
+
+        return 1 if np.isnan(step) else float(step)
+
+
 class PID_TERM:
 
-    _proportional: List[float]
-    _integral: List[float]
-    _derivative: List[float]
+    _proportional: ValueLog
+    _integral: ValueLog
+    _derivative: ValueLog
 
     def __init__(self) -> None:
-        self._proportional = [0]
-        self._integral = [0]
-        self._derivative = [0]
+        self._proportional = ValueLog()
+        self._integral = ValueLog()
+        self._derivative = ValueLog()
+
+        self._proportional.append(0)
+        self._integral.append(0)
+        self._derivative.append(0)
 
     @property
-    def proportional(self):
-        return self._proportional
+    def proportional(self) -> np.ndarray:
+        return self._proportional.values
 
     @property
-    def integral(self):
-        return self._integral
+    def integral(self) -> np.ndarray:
+        return self._integral.values
 
     @property
-    def derivative(self):
-        return self._derivative
+    def derivative(self) -> np.ndarray:
+        return self._derivative.values
 
     def add_proportional(self, value: float):
         self._proportional.append(value)
@@ -46,6 +99,11 @@ class PID_TERM:
 
 
 class PID_Controller:
+    """PID controller with O(1) steps: the integral of the error is updated
+    with the trapezoidal rule on every new error and the derivative of the
+    process variable is the difference of its last two samples. The time
+    step comes from `Timed_Value.time`, without timestamps it is 1.
+    """
 
     term: PID_TERM
 
@@ -55,12 +113,12 @@ class PID_Controller:
     tauD: float
     controller_output_zero: float
 
-    _error_list: List[Timed_Value]  #
+    _error_log: ValueLog
     _error_integral: float
-    _error_integral_cache_index: int
 
-    _process_output_list: List[float]  #
-    _process_variable_list: List[float]
+    _process_output_log: ValueLog
+    _process_variable_log: ValueLog
+    _derivative_process_variable: float
 
     def __init__(
         self,
@@ -84,46 +142,62 @@ class PID_Controller:
 
         self.controller_output_zero = controller_output_zero
 
-        self._error_integral_cache_index = 0
-
-        self._error_list = []
-        self._error_integral_list = [0]
+        self._error_log = ValueLog()
         self._error_integral = 0
 
-        self._process_variable_list = []
-        self._derivative_process_variable_list = [0]
+        self._process_variable_log = ValueLog()
         self._derivative_process_variable = 0
 
-        self._process_output_list = [controller_output_zero]
+        self._process_output_log = ValueLog()
+        self._process_output_log.append(controller_output_zero)
 
     @property
-    def process_output_list(self):
-        return self._process_output_list
+    def process_output_list(self) -> np.ndarray:
+        return self._process_output_log.values
 
     def add_process_output(self, value: float):
-        self._process_output_list.append(value)
+        self._process_output_log.append(value)
 
     @property
-    def error_list(self):
-        return self._error_list
+    def error_list(self) -> np.ndarray:
+        return self._error_log.values
 
     @property
-    def error_integral(self):
+    def error_integral(self) -> float:
         return self._error_integral
 
     @property
-    def process_variable_list(self):
-        return self._process_variable_list
+    def process_variable_list(self) -> np.ndarray:
+        return self._process_variable_log.values
 
     @property
-    def derivative_process_variable(self):
+    def derivative_process_variable(self) -> float:
         return self._derivative_process_variable
 
     def add_error(self, error: Timed_Value):
-        self._error_list.append(error)
-
-    def add_process_variable(self, process_variable: float):
-        self._process_variable_list.append(process_variable)
+        self._error_log.append(error.value, error.time)
+
+        if len(self._error_log) > 1:
+            self._error_integral += (
+                (self._error_log[-2] + self._error_log[-1])
+                / 2
+                * self._error_log.last_step()
+            )
+
+    def add_process_variable(self, process_variable: Timed_Value):
+        self._process_variable_log.append(process_variable.value, process_variable.time)
+
+        if len(self._process_variable_log) > 1:
+            self._derivative_process_variable = (
+                self._process_variable_log[-1] - self._process_variable_log[-2]
+            ) / self._process_variable_log.last_step()
+
+    def restart(self, controller_output_zero: float):
+        """Restarts the control from `controller_output_zero`, the integral
+        accumulated so far is discarded, the history is kept.
+        """
+        self.controller_output_zero = controller_output_zero
+        self._error_integral = 0
 
     @staticmethod
     def check_limit_diff(error, lim):
@@ -131,31 +205,18 @@ class PID_Controller:
 
     @property
     def proportional_term(self) -> float:
-        if len(self.error_list) > 0:
-            return self.controller_gain * self.error_list[-1].value
+        if len(self._error_log) > 0:
+            return self.controller_gain * self._error_log[-1]
         else:
             return 0
 
     @property
     def integral_term(self) -> float:
-        # index_error_list = len(self._error_list)
-
-        # if index_error_list > self._error_integral_cache_index:
-        #     self._error_integral += calculate_area(
-        #         self._error_list[self._error_integral_cache_index :]
-        #     )
-        #     self._error_integral_cache_index = index_error_list
-
-        return (
-            self.controller_gain
-            * calculate_area([error.value for error in self.error_list])
-            / self.tauI
-        )
+        return self.controller_gain * self._error_integral / self.tauI
 
     @property
     def derivative_term(self) -> float:
-        gradient = calculate_gradient(self.process_variable_list)
-        return -self.controller_gain * self.tauD * gradient
+        return -self.controller_gain * self.tauD * self._derivative_process_variable
 
     @property
     def output_process(self) -> float:
@@ -173,21 +234,6 @@ class PID_Controller:
         )
 
 
-def calculate_area(function: List[float]) -> float:
-    if len(function) > 1:
-        return float(np.trapz(function))
-    else:
-        return 0
-
-
-def calculate_gradient(function: List[float]) -> float:
-
-    if len(function) > 1:
-        return float(np.gradient(function)[-1])
-    else:
-        return 0
-
-
 if __name__ == "__main__":
 
     dBu4 = 1.27
@@ -1,10 +1,10 @@
 import enum
 import pathlib
-from typing import List, Optional
+from typing import List, Optional, Union
 
 import numpy as np
-import pandas as pd
-from scipy.fft import fft
+from scipy.fft import rfft
+from scipy.signal import get_window
 
 from audio.console import console
 from audio.math import (
@@ -12,7 +12,8 @@ from audio.math import (
     integrate,
 )
 from audio.math.interpolation import INTERPOLATION_KIND, interpolation_model
-from audio.utility import read_voltages
+from audio.model.sweep import save_sample_csv
+from audio.utility import AcquisitionSession, read_voltages
 from audio.utility.timer import Timer
 
 
@@ -20,6 +21,36 @@ class RMS_MODE(enum.Enum):
     FFT = 1
     AVERAGE = 2
     INTEGRATE = 3
+    SINE_FIT = 4
+    GOERTZEL = 5
+
+
+class SineFit:
+    """Result of the IEEE 1057 sine fit: offset + amplitude * sin(2 pi f t + phase)"""
+
+    amplitude: float
+    phase: float
+    offset: float
+    frequency: float
+    residual: float
+
+    def __init__(
+        self,
+        amplitude: float,
+        phase: float,
+        offset: float,
+        frequency: float,
+        residual: float,
+    ) -> None:
+        self.amplitude = amplitude
+        self.phase = phase
+        self.offset = offset
+        self.frequency = frequency
+        self.residual = residual
+
+    @property
+    def rms(self) -> float:
+        return self.amplitude / np.sqrt(2)
 
 
 class RMS:
@@ -36,10 +67,9 @@ class RMS:
         save_file: Optional[pathlib.Path] = None,
         trim: bool = True,
         interpolation_rate: float = 10,
+        session: Optional[AcquisitionSession] = None,
     ) -> Optional[float]:
 
-        timer = Timer()
-
         # Pre allocate the array
         try:
             voltages = read_voltages(
@@ -49,26 +79,65 @@ class RMS:
                 ch_input=ch_input,
                 max_voltage=max_voltage,
                 min_voltage=min_voltage,
+                session=session,
             )
+        except Exception as e:
+            console.log(e)
+            return None
+
+        return RMS.rms_from_voltages(
+            voltages,
+            frequency=frequency,
+            Fs=Fs,
+            rms_mode=rms_mode,
+            time_report=time_report,
+            save_file=save_file,
+            trim=trim,
+            interpolation_rate=interpolation_rate,
+        )
 
+    @staticmethod
+    def rms_from_voltages(
+        voltages: np.ndarray,
+        frequency: float,
+        Fs: float,
+        rms_mode: RMS_MODE = RMS_MODE.FFT,
+        time_report: bool = False,
+        save_file: Optional[pathlib.Path] = None,
+        trim: bool = True,
+        interpolation_rate: float = 10,
+    ) -> Optional[float]:
+        """Calculate the RMS Voltage value of an already acquired sampling.
+        It doesn't touch the instruments, so it can run on a worker thread
+        while the next point is acquired.
+
+        Args:
+            voltages (np.ndarray): The sampling voltages
+            frequency (float): The frequency of the sampled sine
+            Fs (float): The sampling rate
+
+        Returns:
+            Optional[float]: The RMS Voltage, None on error
+        """
+
+        timer = Timer()
+
+        try:
             if save_file:
-                with open(save_file.absolute().resolve(), "w", encoding="utf-8") as f:
-                    f.write("# frequency: {}\n".format(round(frequency, 5)))
-                    f.write("# Fs: {}\n".format(round(Fs, 5)))
-                    pd.DataFrame(voltages).to_csv(
-                        f,
-                        header=["voltage"],
-                        index=None,
-                    )
-
-            _, y_interpolated = interpolation_model(
-                range(0, len(voltages)),
-                voltages,
-                int(len(voltages) * interpolation_rate),
-                kind=INTERPOLATION_KIND.CUBIC,
-            )
+                save_sample_csv(save_file, voltages, frequency, Fs)
+
+            # A capture with an integer number of periods (coherent sampling)
+            # doesn't need to be trimmed, nor interpolated. The sine fit works
+            # with any number of periods, the single bin detector is windowed
+            # instead of trimmed: the interpolation would change its Fs
+            if trim and rms_mode not in (RMS_MODE.SINE_FIT, RMS_MODE.GOERTZEL):
+                _, y_interpolated = interpolation_model(
+                    range(0, len(voltages)),
+                    voltages,
+                    int(len(voltages) * interpolation_rate),
+                    kind=INTERPOLATION_KIND.CUBIC,
+                )
 
-            if trim:
                 voltages, _, _ = find_sin_zero_offset(y_interpolated)
 
             rms: Optional[float] = None
@@ -82,6 +151,12 @@ class RMS:
                 rms = RMS.average(voltages)
             elif rms_mode == RMS_MODE.INTEGRATE:
                 rms = RMS.integration(voltages, Fs)
+            elif rms_mode == RMS_MODE.SINE_FIT:
+                rms = RMS.sine_fit(voltages, frequency, Fs).rms
+            elif rms_mode == RMS_MODE.GOERTZEL:
+                rms = RMS.goertzel(
+                    voltages, frequency, Fs, window="hann" if trim else None
+                )
 
             if time_report:
                 timer.stop().print()
@@ -117,18 +192,170 @@ class RMS:
 
         Args:
             voltages (List[float]): The sampling voltages list
-            number_of_samples (int): The number of sampling
 
         Returns:
             float: The RMS Voltage
         """
+        return float(RMS.fft_batch(np.asarray(voltages, dtype=float)))
+
+    @staticmethod
+    def fft_batch(matrix) -> np.ndarray:
+        """Calculate the RMS Voltage value of many samplings of the same length
+        in one call, with the Parseval theorem on the real FFT.
+
+        The real FFT holds only the non negative frequencies, so every bin
+        except the DC (and the Nyquist one, for an even number of samples)
+        is counted twice.
+
+        Args:
+            matrix (np.ndarray): The samplings, one per row
+
+        Returns:
+            np.ndarray: The RMS Voltage of every row
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        n_samp = matrix.shape[-1]
+
+        power = np.square(np.absolute(rfft(matrix, n_samp, axis=-1, workers=-1)))
+
+        summation = 2 * np.sum(power, axis=-1) - power[..., 0]
+        if n_samp % 2 == 0:
+            summation -= power[..., -1]
+
+        return np.sqrt(summation) / n_samp
+
+    @staticmethod
+    def fft_bins(voltages, bins) -> np.ndarray:
+        """Calculate the RMS Voltage value of every single FFT bin,
+        same normalization of `RMS.fft`, restricted to the bin and its
+        negative frequency.
+
+        Args:
+            voltages (List[float]): The sampling voltages list
+            bins (List[int]): The FFT bins, between 1 and n_samp / 2
+
+        Returns:
+            np.ndarray: The RMS Voltage of every bin
+        """
         n_samp = len(voltages)
-        voltages_fft = fft(voltages, n_samp, workers=-1)
+        voltages_fft = rfft(voltages, n_samp, workers=-1)
+
+        bins = np.asarray(bins, dtype=int)
+        summation = 2 * np.square(np.absolute(voltages_fft[bins]))
+        if n_samp % 2 == 0:
+            summation[bins == n_samp // 2] /= 2
+
+        return np.sqrt(summation) / n_samp
+
+    @staticmethod
+    def sine_fit(
+        voltages,
+        frequency: float,
+        Fs: float,
+        refine_frequency: bool = False,
+        max_iterations: int = 10,
+        tolerance: float = 1e-9,
+    ) -> SineFit:
+        """Fit the sine with linear least squares at the known frequency
+        (IEEE 1057 three-parameter fit). With `refine_frequency` the frequency
+        is refined iteratively too (four-parameter fit).
+
+        The fit doesn't need an integer number of periods, so the sampling
+        is neither interpolated nor trimmed.
+
+        Args:
+            voltages (List[float]): The sampling voltages list
+            frequency (float): The frequency of the sampled sine
+            Fs (float): The sampling rate
+            refine_frequency (bool, optional): Four-parameter fit.
+            max_iterations (int, optional): Iterations of the four-parameter fit.
+            tolerance (float, optional): Relative frequency step that stops
+                the four-parameter fit.
+
+        Returns:
+            SineFit: amplitude, phase, offset, frequency and the RMS of the
+                residual
+        """
+        voltages = np.asarray(voltages, dtype=float)
+        t = np.arange(len(voltages)) / Fs
+
+        def fit(frequency: float, a: Optional[float] = None, b: float = 0):
+            omega_t = 2 * np.pi * frequency * t
+            sin, cos = np.sin(omega_t), np.cos(omega_t)
+
+            columns = [sin, cos, np.ones(len(t))]
+            if a is not None:
+                # Linearization around the current frequency
+                columns.append(2 * np.pi * t * (a * cos - b * sin))
+
+            design = np.column_stack(columns)
+            solution, *_ = np.linalg.lstsq(design, voltages, rcond=None)
+
+            return solution, voltages - design @ solution
+
+        (a, b, offset), residual = fit(frequency)
+
+        if refine_frequency:
+            for _ in range(max_iterations):
+                (a, b, offset, delta), residual = fit(frequency, a, b)
+                frequency += delta
+
+                if abs(delta) < tolerance * frequency:
+                    break
+
+        return SineFit(
+            amplitude=float(np.hypot(a, b)),
+            phase=float(np.arctan2(b, a)),
+            offset=float(offset),
+            frequency=float(frequency),
+            residual=float(np.sqrt(np.mean(np.square(residual)))),
+        )
+
+    @staticmethod
+    def goertzel(
+        voltages,
+        frequency: float,
+        Fs: float,
+        window: Optional[Union[str, tuple]] = None,
+    ) -> Union[float, np.ndarray]:
+        """Calculate the RMS Voltage value of the single bin at `frequency`,
+        like the Goertzel algorithm, in O(N). The broadband noise outside the
+        bin isn't counted as signal.
+
+        The bin is evaluated as the dot product with the complex exponential,
+        the same value of the Goertzel recursion, also at a non integer bin.
+        The kernel is built once for a batch of samplings of the same length.
+
+        Without a window the sampling must hold an integer number of periods:
+        otherwise the leakage of the negative frequency is an error of some
+        percent. The Hann window brings it below 0.1% from four periods.
+
+        Args:
+            voltages (np.ndarray): The sampling, or many samplings of the same
+                length, one per row
+            frequency (float): The frequency of the sampled sine
+            Fs (float): The sampling rate
+            window (Optional[Union[str, tuple]], optional): A `scipy.signal`
+                window, the amplitude is corrected by its coherent gain.
+
+        Returns:
+            Union[float, np.ndarray]: The RMS Voltage, one per row for a batch
+        """
+        voltages = np.asarray(voltages, dtype=float)
+        n_samp = voltages.shape[-1]
+
+        if window is None:
+            weights = np.ones(n_samp)
+        else:
+            weights = get_window(window, n_samp)
+
+        kernel = weights * np.exp(-2j * np.pi * frequency / Fs * np.arange(n_samp))
 
-        summation = np.sum([np.float_power(np.absolute(v), 2) for v in voltages_fft])
-        rms: float = np.sqrt(summation) / n_samp
+        # Peak amplitude 2 |X| / sum(w), RMS = peak / sqrt(2)
+        rms = np.sqrt(2) * np.absolute(np.atleast_2d(voltages) @ kernel)
+        rms /= np.sum(weights)
 
-        return rms
+        return float(rms[0]) if voltages.ndim == 1 else rms
 
     @staticmethod
     def integration(voltages: List[float], Fs: float) -> float:
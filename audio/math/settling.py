@@ -0,0 +1,126 @@
+import math
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from audio.math.rms import RMS
+from audio.utility import AcquisitionSession
+
+
+class SettlingResult:
+    settled: bool
+    settle_time: float
+    rms_list: List[float]
+
+    def __init__(self, settled: bool, settle_time: float, rms_list: List[float]):
+        self.settled = settled
+        self.settle_time = settle_time
+        self.rms_list = rms_list
+
+    @property
+    def rms(self) -> Optional[float]:
+        return self.rms_list[-1] if len(self.rms_list) > 0 else None
+
+
+class SettlingDetector:
+    """Waits for the generator and the DUT to settle after a SCPI change.
+
+    Short blocks are captured one after the other, the signal is considered
+    settled when the relative RMS change between two consecutive blocks drops
+    below `tolerance`. After `timeout` seconds, and at least two blocks, it
+    gives up and the measurement goes on anyway.
+
+    A block is `cycles_per_block` periods long, but at most a quarter of the
+    timeout: at the low frequencies a few periods would take the whole
+    timeout and no two blocks could be compared.
+    """
+
+    DEFAULT_TOLERANCE: float = 0.001
+    DEFAULT_TIMEOUT: float = 0.4
+
+    tolerance: float
+    timeout: float
+    cycles_per_block: float
+    min_samples_per_block: int
+
+    def __init__(
+        self,
+        tolerance: Optional[float] = None,
+        timeout: Optional[float] = None,
+        cycles_per_block: float = 4,
+        min_samples_per_block: int = 64,
+    ) -> None:
+        self.tolerance = tolerance if tolerance is not None else self.DEFAULT_TOLERANCE
+        self.timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
+        self.cycles_per_block = cycles_per_block
+        self.min_samples_per_block = min_samples_per_block
+
+    def block_size(self, frequency: float, Fs: float) -> int:
+        duration = min(self.cycles_per_block / frequency, self.timeout / 4)
+
+        return max(self.min_samples_per_block, int(math.ceil(duration * Fs)))
+
+    def is_settled(self, previous: float, current: float) -> bool:
+        if previous == 0:
+            return current == 0
+
+        return abs(current - previous) / abs(previous) < self.tolerance
+
+    def wait(
+        self,
+        read_block: Callable[[], np.ndarray],
+        frequency: float,
+        Fs: float,
+        start_time: Optional[float] = None,
+    ) -> SettlingResult:
+        """Captures blocks with `read_block` until the RMS is stable.
+
+        Args:
+            read_block (Callable[[], np.ndarray]): Returns a new short capture
+            frequency (float): The frequency of the generated sine
+            Fs (float): The sampling rate of the blocks
+            start_time (Optional[float], optional): `time.perf_counter()` of the
+                SCPI change, the settle time is measured from there.
+
+        Returns:
+            SettlingResult: settled flag, settle time [s] and block RMS values
+        """
+        if start_time is None:
+            start_time = time.perf_counter()
+
+        rms_list: List[float] = []
+
+        while True:
+            rms_list.append(block_rms(read_block(), frequency, Fs))
+
+            settle_time = time.perf_counter() - start_time
+
+            if len(rms_list) > 1 and self.is_settled(rms_list[-2], rms_list[-1]):
+                return SettlingResult(True, settle_time, rms_list)
+
+            if settle_time >= self.timeout and len(rms_list) > 1:
+                return SettlingResult(False, settle_time, rms_list)
+
+    def wait_session(
+        self,
+        session: AcquisitionSession,
+        frequency: float,
+        Fs: float,
+        start_time: Optional[float] = None,
+    ) -> SettlingResult:
+        number_of_samples = self.block_size(frequency, Fs)
+
+        return self.wait(
+            lambda: session.read_voltages(frequency, Fs, number_of_samples),
+            frequency=frequency,
+            Fs=Fs,
+            start_time=start_time,
+        )
+
+
+def block_rms(voltages: np.ndarray, frequency: float, Fs: float) -> float:
+    """RMS of the sine at `frequency` with the three-parameter sine fit,
+    so that blocks with a non integer number of cycles compare correctly.
+    """
+    return RMS.sine_fit(voltages, frequency, Fs).rms
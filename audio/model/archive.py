@@ -0,0 +1,226 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pandas import DataFrame, Series
+
+from audio.model.capture import RawCapture, scale_codes
+from audio.model.sweep import SingleSweepData, SweepData
+
+ARCHIVE_SUFFIX: str = ".npz"
+
+_ATTRIBUTES_KEY = "attributes"
+_COLUMN_PREFIX = "column/"
+_CAPTURE_PREFIX = "capture/"
+_CAPTURE_FREQUENCY_KEY = "capture_frequency"
+_CAPTURE_FS_KEY = "capture_Fs"
+_SCALING_COEFFICIENTS_KEY = "scaling_coefficients"
+
+
+class SweepPoint:
+    """A single capture of the archive, same interface of `SingleSweepData`."""
+
+    frequency: float
+    Fs: float
+
+    _archive: "SweepArchive"
+    _index: int
+
+    def __init__(self, archive: "SweepArchive", index: int) -> None:
+        self._archive = archive
+        self._index = index
+
+        self.frequency = float(archive.capture_frequency[index])
+        self.Fs = float(archive.capture_Fs[index])
+
+    @property
+    def voltages(self) -> Series:
+        return Series(self._archive.capture(self._index), name="voltages")
+
+
+class SweepArchive:
+    """One binary file per sweep: the sweep table as typed columns, every
+    capture as its own array and the metadata as JSON attributes.
+
+    It's a NumPy `.npz`, the arrays are read only when accessed, so a
+    single point doesn't load the whole sweep. The captures of a raw sweep
+    are the int16 or int32 codes of the ADC, scaled to volts when read.
+    """
+
+    path: Path
+
+    _npz: Any
+    _attributes: Optional[Dict]
+
+    def __init__(self, path: Path) -> None:
+        if not path.exists():
+            raise Exception
+
+        self.path = path
+        self._npz = np.load(path.absolute().resolve(), allow_pickle=False)
+        self._attributes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.capture_frequency)
+
+    def close(self):
+        self._npz.close()
+
+    @property
+    def attributes(self) -> Dict:
+        if self._attributes is None:
+            self._attributes = json.loads(str(self._npz[_ATTRIBUTES_KEY]))
+
+        return self._attributes
+
+    @property
+    def amplitude(self) -> Optional[float]:
+        return self.attributes.get("amplitude")
+
+    @property
+    def columns(self) -> List[str]:
+        return [
+            key[len(_COLUMN_PREFIX) :]
+            for key in self._npz.files
+            if key.startswith(_COLUMN_PREFIX)
+        ]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._npz[_COLUMN_PREFIX + name]
+
+    @property
+    def data(self) -> DataFrame:
+        """The sweep table, like `SweepData.data`."""
+        return DataFrame({name: self.column(name) for name in self.columns})
+
+    @property
+    def capture_frequency(self) -> np.ndarray:
+        return self._npz[_CAPTURE_FREQUENCY_KEY]
+
+    @property
+    def capture_Fs(self) -> np.ndarray:
+        return self._npz[_CAPTURE_FS_KEY]
+
+    @property
+    def is_raw(self) -> bool:
+        return _SCALING_COEFFICIENTS_KEY in self._npz.files
+
+    def capture(self, index: int) -> np.ndarray:
+        """The voltages of the capture."""
+        capture = self._npz["{}{}".format(_CAPTURE_PREFIX, index)]
+
+        if self.is_raw:
+            return scale_codes(capture, self._npz[_SCALING_COEFFICIENTS_KEY])
+
+        return capture
+
+    def raw_capture(self, index: int) -> RawCapture:
+        """The codes of the capture, only for a raw sweep."""
+        if not self.is_raw:
+            raise ValueError("The archive doesn't store the unscaled codes.")
+
+        return RawCapture(
+            self._npz["{}{}".format(_CAPTURE_PREFIX, index)],
+            self._npz[_SCALING_COEFFICIENTS_KEY],
+        )
+
+    def point(self, index: int) -> SweepPoint:
+        return SweepPoint(self, index)
+
+    def points(self) -> List[SweepPoint]:
+        return [self.point(index) for index in range(len(self))]
+
+    @staticmethod
+    def write(
+        path: Path,
+        data: DataFrame,
+        captures: List[np.ndarray],
+        capture_frequency: List[float],
+        capture_Fs: List[float],
+        attributes: Optional[Dict] = None,
+        dtype=np.float64,
+        scaling_coefficients: Optional[np.ndarray] = None,
+    ) -> Path:
+        """Writes the whole sweep in a single file.
+
+        Args:
+            path (Path): The archive file, `.npz` is appended if missing
+            data (DataFrame): The sweep table, one typed array per column
+            captures (List[np.ndarray]): The voltages of every point
+            capture_frequency (List[float]): The frequency of every capture
+            capture_Fs (List[float]): The sampling rate of every capture
+            attributes (Optional[Dict], optional): JSON serializable metadata
+            dtype (optional): `np.float32` halves the size of the captures.
+            scaling_coefficients (Optional[np.ndarray], optional): The captures
+                are ADC codes, stored as they are with the device scaling
+                polynomial. `dtype` is ignored.
+
+        Returns:
+            Path: The archive file
+        """
+        arrays: Dict[str, np.ndarray] = {
+            _ATTRIBUTES_KEY: np.array(json.dumps(attributes if attributes else {})),
+            _CAPTURE_FREQUENCY_KEY: np.asarray(capture_frequency, dtype=np.float64),
+            _CAPTURE_FS_KEY: np.asarray(capture_Fs, dtype=np.float64),
+        }
+
+        for name in data.columns:
+            arrays[_COLUMN_PREFIX + name] = data[name].to_numpy()
+
+        if scaling_coefficients is not None:
+            arrays[_SCALING_COEFFICIENTS_KEY] = np.asarray(
+                scaling_coefficients, dtype=np.float64
+            )
+            dtype = None
+
+        for index, capture in enumerate(captures):
+            arrays["{}{}".format(_CAPTURE_PREFIX, index)] = np.asarray(
+                capture, dtype=dtype
+            )
+
+        if path.suffix != ARCHIVE_SUFFIX:
+            path = path.with_suffix(ARCHIVE_SUFFIX)
+
+        np.savez(path, **arrays)
+
+        return path
+
+    @staticmethod
+    def from_csv_tree(
+        measurements_file_path: Path,
+        archive_file_path: Optional[Path] = None,
+        dtype=np.float64,
+    ) -> Path:
+        """Converts a sweep saved as CSV, the `sweep.csv` and the
+        `sweep/<frequency>/sample.csv` captures next to it, in an archive.
+
+        Returns:
+            Path: The archive file, by default `sweep.npz` next to `sweep.csv`
+        """
+        sweep_data = SweepData(measurements_file_path)
+
+        sample_files = sorted(
+            (measurements_file_path.parent / "sweep").rglob("sample.csv"),
+            key=lambda file: float(file.parent.name.replace("_", ".")),
+        )
+        points = [SingleSweepData(file) for file in sample_files]
+
+        if archive_file_path is None:
+            archive_file_path = measurements_file_path.with_suffix(ARCHIVE_SUFFIX)
+
+        return SweepArchive.write(
+            archive_file_path,
+            sweep_data.data,
+            captures=[point.voltages.values for point in points],
+            capture_frequency=[point.frequency for point in points],
+            capture_Fs=[point.Fs for point in points],
+            attributes={"amplitude": sweep_data.amplitude},
+            dtype=dtype,
+        )
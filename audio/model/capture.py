@@ -0,0 +1,42 @@
+from typing import List, Union
+
+import numpy as np
+
+
+class RawCapture:
+    """A capture as the unscaled codes of the ADC, int16 or int32 as the raw
+    samples of the device.
+
+    The codes are a quarter, or a half, of the float64 volts in memory. The
+    device scaling polynomial, `volts = c0 + c1 * code + c2 * code^2 + ...`,
+    is read once per session and applied only when `voltages` is accessed,
+    the volts aren't kept.
+    """
+
+    codes: np.ndarray
+    coefficients: np.ndarray
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        coefficients: Union[List[float], np.ndarray],
+    ) -> None:
+        self.codes = np.asarray(codes)
+
+        if self.codes.dtype not in (np.int16, np.int32):
+            raise ValueError("The codes must be int16 or int32.")
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def voltages(self) -> np.ndarray:
+        return scale_codes(self.codes, self.coefficients)
+
+
+def scale_codes(codes: np.ndarray, coefficients: np.ndarray) -> np.ndarray:
+    """The volts of the ADC codes, through the device scaling polynomial."""
+    return np.polynomial.polynomial.polyval(
+        np.asarray(codes, dtype=np.float64), coefficients
+    )
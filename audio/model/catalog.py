@@ -0,0 +1,289 @@
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from audio.utility import get_subfolder
+
+CATALOG_FILE_NAME: str = "catalog.sqlite3"
+
+# The sweep directories are named after the start of the sweep
+SWEEP_DIR_FORMAT: str = r"%Y-%m-%d--%H-%M-%f"
+
+_COLUMNS: List[str] = [
+    "timestamp",
+    "directory",
+    "measurements_file",
+    "archive_file",
+    "config_hash",
+    "serial",
+    "points",
+    "mode",
+]
+
+
+def _count_points(measurements_file: Path) -> int:
+    """Rows of the sweep table, the comments and the header excluded. A
+    sweep just started has no file yet."""
+    if not measurements_file.exists():
+        return 0
+
+    with open(measurements_file, "r", encoding="utf-8") as f:
+        lines = sum(1 for line in f if not line.startswith("#") and line.strip())
+
+    return max(0, lines - 1)
+
+
+def config_hash(config) -> str:
+    """SHA-256 of the configuration XML, equal configurations give the
+    same hash.
+    """
+    return hashlib.sha256(repr(config).encode("utf-8")).hexdigest()
+
+
+class CatalogEntry:
+    timestamp: datetime
+    directory: Path
+    measurements_file: Path
+    archive_file: Optional[Path]
+    config_hash: Optional[str]
+    serial: Optional[str]
+    points: int
+    mode: str
+
+    def __init__(
+        self,
+        timestamp: datetime,
+        directory: Path,
+        measurements_file: Path,
+        archive_file: Optional[Path] = None,
+        config_hash: Optional[str] = None,
+        serial: Optional[str] = None,
+        points: int = 0,
+        mode: str = "step",
+    ) -> None:
+        self.timestamp = timestamp
+        self.directory = directory
+        self.measurements_file = measurements_file
+        self.archive_file = archive_file
+        self.config_hash = config_hash
+        self.serial = serial
+        self.points = points
+        self.mode = mode
+
+    def __rich_repr__(self):
+        yield "timestamp", self.timestamp.isoformat(sep=" ")
+        yield "directory", str(self.directory)
+        yield "measurements_file", str(self.measurements_file)
+        yield "archive_file", str(self.archive_file) if self.archive_file else None
+        yield "config_hash", self.config_hash
+        yield "serial", self.serial
+        yield "points", self.points
+        yield "mode", self.mode
+
+    @classmethod
+    def from_sweep(
+        cls,
+        measurements_file: Path,
+        config=None,
+        serial: Optional[str] = None,
+        mode: str = "step",
+        timestamp: Optional[datetime] = None,
+    ):
+        """The entry of a sweep just written, the `.npz` archive next to the
+        sweep file is recorded when it exists.
+        """
+        archive_file = measurements_file.with_suffix(".npz")
+
+        return cls(
+            timestamp=timestamp if timestamp else datetime.now(),
+            directory=measurements_file.parent,
+            measurements_file=measurements_file,
+            archive_file=archive_file if archive_file.exists() else None,
+            config_hash=config_hash(config) if config is not None else None,
+            serial=serial,
+            points=_count_points(measurements_file),
+            mode=mode,
+        )
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row):
+        return cls(
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            directory=Path(row["directory"]),
+            measurements_file=Path(row["measurements_file"]),
+            archive_file=Path(row["archive_file"]) if row["archive_file"] else None,
+            config_hash=row["config_hash"],
+            serial=row["serial"],
+            points=row["points"],
+            mode=row["mode"],
+        )
+
+
+class Catalog:
+    """Index of the sweeps of a home directory, a SQLite file in the home.
+
+    Every sweep written adds a row, so finding the latest sweep, or the
+    sweeps of a DUT serial or of a date range, is an indexed query instead
+    of a scan of the home directory.
+    """
+
+    path: Path
+
+    def __init__(self, home: Path) -> None:
+        self.path = home / CATALOG_FILE_NAME
+
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS sweep (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    directory TEXT NOT NULL,
+                    measurements_file TEXT NOT NULL UNIQUE,
+                    archive_file TEXT,
+                    config_hash TEXT,
+                    serial TEXT,
+                    points INTEGER NOT NULL,
+                    mode TEXT NOT NULL
+                )
+                """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS sweep_timestamp ON sweep (timestamp)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS sweep_serial ON sweep (serial, timestamp)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection committed, or rolled back on error, and closed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _select(
+        self,
+        where: str = "",
+        parameters: tuple = (),
+        order: str = "ORDER BY timestamp",
+    ) -> List[CatalogEntry]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT {} FROM sweep {} {}".format(", ".join(_COLUMNS), where, order),
+                parameters,
+            ).fetchall()
+
+        return [CatalogEntry.from_row(row) for row in rows]
+
+    def add(self, entry: CatalogEntry):
+        """Adds the sweep. A sweep already in the catalog, e.g. a resumed one,
+        is updated in place and keeps the timestamp of its first run."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO sweep ({}) VALUES ({}) "
+                "ON CONFLICT (measurements_file) DO UPDATE SET {}".format(
+                    ", ".join(_COLUMNS),
+                    ", ".join("?" * len(_COLUMNS)),
+                    ", ".join(
+                        "{0} = excluded.{0}".format(column)
+                        for column in _COLUMNS
+                        if column != "timestamp"
+                    ),
+                ),
+                (
+                    entry.timestamp.isoformat(),
+                    str(entry.directory.absolute().resolve()),
+                    str(entry.measurements_file.absolute().resolve()),
+                    (
+                        str(entry.archive_file.absolute().resolve())
+                        if entry.archive_file
+                        else None
+                    ),
+                    entry.config_hash,
+                    entry.serial,
+                    entry.points,
+                    entry.mode,
+                ),
+            )
+
+    def latest(self, serial: Optional[str] = None) -> Optional[CatalogEntry]:
+        order = "ORDER BY timestamp DESC LIMIT 1"
+
+        if serial is None:
+            entries = self._select(order=order)
+        else:
+            entries = self._select("WHERE serial = ?", (serial,), order=order)
+
+        return entries[0] if len(entries) > 0 else None
+
+    def by_serial(self, serial: str) -> List[CatalogEntry]:
+        return self._select("WHERE serial = ?", (serial,))
+
+    def between(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[CatalogEntry]:
+        return self._select(
+            "WHERE timestamp >= ? AND timestamp <= ?",
+            (
+                (start if start else datetime.min).isoformat(),
+                (end if end else datetime.max).isoformat(),
+            ),
+        )
+
+    def rebuild(self, home: Path) -> int:
+        """Adds the sweeps of `home` made before the catalog existed.
+
+        Returns:
+            int: The number of sweeps found
+        """
+        count = 0
+
+        for directory in get_subfolder(home):
+            measurements_file = directory / "sweep.csv"
+
+            if not measurements_file.exists():
+                continue
+
+            self.add(
+                CatalogEntry.from_sweep(
+                    measurements_file,
+                    timestamp=datetime.strptime(directory.name, SWEEP_DIR_FORMAT),
+                )
+            )
+            count += 1
+
+        return count
+
+
+def latest_sweep_dir(home: Path) -> Optional[Path]:
+    """The directory of the most recent sweep of `home`: the newer of the
+    latest catalog entry and of the newest sweep directory, so a sweep that
+    is not in the catalog, made before it or crashed, is still found.
+    """
+    candidates: List[Tuple[datetime, Path]] = []
+
+    entry = Catalog(home).latest()
+    if entry is not None and entry.directory.exists():
+        candidates.append((entry.timestamp, entry.directory))
+
+    measurement_dirs = get_subfolder(home, SWEEP_DIR_FORMAT)
+    if len(measurement_dirs) > 0:
+        candidates.append(
+            (
+                datetime.strptime(measurement_dirs[-1].name, SWEEP_DIR_FORMAT),
+                measurement_dirs[-1],
+            )
+        )
+
+    return max(candidates)[1] if len(candidates) > 0 else None
@@ -0,0 +1,227 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from audio.console import console
+
+LEVEL_CACHE_PATH: Path = Path.home() / ".audio" / "level.json"
+
+
+class LevelKey:
+    """Identifies a level calibration: the same generator, DAQ channel,
+    frequency and target level on the same DUT give the same amplitude.
+    """
+
+    generator: str
+    channel: str
+    frequency: float
+    target: float
+    serial: str
+
+    def __init__(
+        self,
+        generator: str,
+        channel: str,
+        frequency: float,
+        target: float,
+        serial: Optional[str] = None,
+    ) -> None:
+        self.generator = generator
+        self.channel = channel
+        self.frequency = frequency
+        self.target = target
+        self.serial = serial if serial else ""
+
+    def __str__(self) -> str:
+        return "|".join(
+            [
+                self.generator,
+                self.channel,
+                "{:.5f}".format(self.frequency),
+                "{:.8f}".format(self.target),
+                self.serial,
+            ]
+        )
+
+
+class LevelEntry:
+    level_offset: float
+    gain_dB: float
+    timestamp: datetime
+
+    def __init__(
+        self,
+        level_offset: float,
+        gain_dB: float,
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        self.level_offset = level_offset
+        self.gain_dB = gain_dB
+        self.timestamp = timestamp if timestamp else datetime.now()
+
+    def is_valid(self, validity: timedelta, now: Optional[datetime] = None) -> bool:
+        if now is None:
+            now = datetime.now()
+
+        return now - self.timestamp <= validity
+
+    def to_dict(self) -> Dict:
+        return {
+            "level_offset": self.level_offset,
+            "gain_dB": self.gain_dB,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, dictionary: Dict):
+        return cls(
+            level_offset=float(dictionary["level_offset"]),
+            gain_dB=float(dictionary["gain_dB"]),
+            timestamp=datetime.fromisoformat(dictionary["timestamp"]),
+        )
+
+
+class LevelCache:
+    """Persistent store of the set-level calibrations.
+
+    The whole store is a small JSON file loaded in a dictionary, so the
+    lookup doesn't touch the disk. An entry older than `validity` is ignored.
+    """
+
+    path: Path
+    validity: timedelta
+
+    _entries: Dict[str, LevelEntry]
+
+    def __init__(
+        self,
+        path: Path = LEVEL_CACHE_PATH,
+        validity: timedelta = timedelta(hours=8),
+    ) -> None:
+        self.path = path
+        self.validity = validity
+        self._entries = {}
+
+        if self.path.exists():
+            try:
+                self._entries = {
+                    key: LevelEntry.from_dict(entry)
+                    for key, entry in json.loads(
+                        self.path.read_text(encoding="utf-8")
+                    ).items()
+                }
+            except Exception as e:
+                console.print(f"Level cache ignored: {e}", style="error")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: LevelKey) -> Optional[LevelEntry]:
+        """The entry of `key`, None if missing or expired."""
+        entry = self._entries.get(str(key))
+
+        if entry is not None and entry.is_valid(self.validity):
+            return entry
+
+        return None
+
+    def set(self, key: LevelKey, entry: LevelEntry):
+        self._entries[str(key)] = entry
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary_path = self.path.with_suffix(".tmp")
+        temporary_path.write_text(
+            json.dumps(
+                {key: entry.to_dict() for key, entry in self._entries.items()},
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        temporary_path.replace(self.path)
+
+
+class LevelTable:
+    """Generator amplitude vs measured level over a short frequency plan,
+    built in a single pass.
+
+    The correction at a frequency is the gain at `reference_frequency`
+    over the gain at that frequency, interpolated on a logarithmic
+    frequency axis and constant outside the table. Multiplying the
+    generator amplitude by it gives the level of the reference frequency.
+    """
+
+    REFERENCE_FREQUENCY: float = 1000
+
+    frequency: np.ndarray
+    amplitude: np.ndarray
+    rms: np.ndarray
+    reference_frequency: float
+
+    def __init__(
+        self,
+        frequency: List[float],
+        amplitude: List[float],
+        rms: List[float],
+        reference_frequency: float = REFERENCE_FREQUENCY,
+    ) -> None:
+        order = np.argsort(frequency)
+
+        self.frequency = np.asarray(frequency, dtype=float)[order]
+        self.amplitude = np.asarray(amplitude, dtype=float)[order]
+        self.rms = np.asarray(rms, dtype=float)[order]
+        self.reference_frequency = reference_frequency
+
+    def __len__(self) -> int:
+        return len(self.frequency)
+
+    @property
+    def gain(self) -> np.ndarray:
+        return self.rms / self.amplitude
+
+    def _gain_at(self, frequency) -> Union[float, np.ndarray]:
+        return np.interp(np.log10(frequency), np.log10(self.frequency), self.gain)
+
+    def correction(self, frequency) -> Union[float, np.ndarray]:
+        """Factor of the generator amplitude, for one or many frequencies."""
+        return self._gain_at(self.reference_frequency) / self._gain_at(frequency)
+
+    def expected_rms(self, frequency, amplitude) -> Union[float, np.ndarray]:
+        """The RMS level at the DUT output for the generator `amplitude`."""
+        return np.asarray(amplitude) * self._gain_at(frequency)
+
+    def to_csv(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# reference_frequency: {}\n".format(self.reference_frequency))
+            pd.DataFrame(
+                {
+                    "frequency": self.frequency,
+                    "amplitude": self.amplitude,
+                    "rms": self.rms,
+                }
+            ).to_csv(f, index=False)
+
+    @classmethod
+    def from_csv(cls, path: Path):
+        reference_frequency = cls.REFERENCE_FREQUENCY
+
+        with open(path, "r", encoding="utf-8") as f:
+            first_line = f.readline()
+
+        if first_line.startswith("# reference_frequency:"):
+            reference_frequency = float(first_line.split(":")[1])
+
+        data = pd.read_csv(path, comment="#")
+
+        return cls(
+            data["frequency"].values,
+            data["amplitude"].values,
+            data["rms"].values,
+            reference_frequency=reference_frequency,
+        )
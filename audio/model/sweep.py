@@ -1,11 +1,180 @@
+import enum
+import os
 from pathlib import Path
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 import yaml
 from pandas import DataFrame, Series
 
 from audio.console import console
 
+SWEEP_COLUMNS: List[str] = [
+    "frequency",
+    "rms",
+    "dBV",
+    "fs",
+    "oversampling_ratio",
+    "n_periods",
+    "n_samples",
+    "settle_time",
+    "amplitude",
+]
+
+
+class POINT_STATUS(enum.IntEnum):
+    PENDING = 0
+    MEASURED = 1
+    FAILED = 2
+
+
+class SweepResult:
+    """The results of a sweep, one row per point of the frequency plan.
+
+    The rows live in a structured array preallocated from the plan, every
+    row has its status flag so a failed point keeps the others aligned.
+    The columns are views, not copies.
+    """
+
+    _data: np.ndarray
+
+    def __init__(self, number_of_points: int) -> None:
+        # Aligned, so the float columns can be viewed as a 2D array
+        dtype = np.dtype(
+            [(name, np.float64) for name in SWEEP_COLUMNS] + [("status", np.uint8)],
+            align=True,
+        )
+        self._data = np.zeros(number_of_points, dtype=dtype)
+        self._data["status"] = POINT_STATUS.PENDING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def set(self, index: int, **values: float):
+        for name, value in values.items():
+            self._data[name][index] = value
+
+    def set_status(self, index: int, status: POINT_STATUS):
+        self._data["status"][index] = status
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[name]
+
+    def row(self, index: int) -> List:
+        return [
+            (
+                int(self._data[name][index])
+                if name == "n_samples"
+                else self._data[name][index].item()
+            )
+            for name in SWEEP_COLUMNS
+        ]
+
+    @property
+    def status(self) -> np.ndarray:
+        return self._data["status"]
+
+    @property
+    def measured(self) -> np.ndarray:
+        return self.status == POINT_STATUS.MEASURED
+
+    @property
+    def values(self) -> np.ndarray:
+        """All the columns as a 2D float array, a view of the rows."""
+        return np.ndarray(
+            (len(self._data), len(SWEEP_COLUMNS)),
+            dtype=np.float64,
+            buffer=self._data,
+            strides=(self._data.itemsize, np.dtype(np.float64).itemsize),
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """The measured points, without copies if all the points are measured."""
+        values = self.values
+
+        if not np.all(self.measured):
+            values = values[self.measured]
+
+        return pd.DataFrame(values, columns=SWEEP_COLUMNS, copy=False)
+
+
+def save_sample_csv(path: Path, voltages, frequency: float, Fs: float):
+    """Writes a single capture, read back by `SingleSweepData`."""
+    with open(path.absolute().resolve(), "w", encoding="utf-8") as f:
+        f.write("# frequency: {}\n".format(round(frequency, 5)))
+        f.write("# Fs: {}\n".format(round(Fs, 5)))
+        pd.DataFrame(voltages).to_csv(
+            f,
+            header=["voltage"],
+            index=None,
+        )
+
+
+class SweepWriter:
+    """Appends every point to the sweep file as soon as it is measured, so
+    an interrupted sweep keeps all the points done.
+
+    The file is flushed at every point and synced to the disk every
+    `fsync_every` points, 0 leaves it to the operating system.
+    An existing file is overwritten, or continued with `resume`, without
+    writing the header again.
+    """
+
+    path: Path
+    fsync_every: int
+
+    _count: int
+
+    def __init__(
+        self,
+        path: Path,
+        amplitude_peak_to_peak: float,
+        columns: List[str],
+        fsync_every: int = 1,
+        resume: bool = False,
+    ) -> None:
+        self.path = path
+        self.fsync_every = fsync_every
+        self._count = 0
+
+        new_file = not resume or not path.exists() or path.stat().st_size == 0
+
+        self._file = open(
+            path.absolute().resolve(), "w" if new_file else "a", encoding="utf-8"
+        )
+
+        if new_file:
+            self._file.write(
+                "# amplitude: {}\n".format(round(amplitude_peak_to_peak, 5))
+            )
+            self._file.write(",".join(columns) + "\n")
+            self._sync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def append(self, row: List):
+        self._file.write(",".join(str(value) for value in row) + "\n")
+        self._count += 1
+
+        if self.fsync_every > 0 and self._count % self.fsync_every == 0:
+            self._sync()
+        else:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._sync()
+            self._file.close()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
 
 class SingleSweepData:
 
@@ -79,16 +248,7 @@ class SweepData:
             self.path.absolute().resolve(),
             header=0,
             comment="#",
-            names=[
-                "frequency",
-                "rms",
-                "dBV",
-                "Fs",
-                "oversampling_ratio",
-                "n_periods",
-                "n_samples",
-            ],
-        )
+        ).rename(columns={"fs": "Fs"})
 
     def _load_yaml_comments(self):
         data_yaml = "\n".join(
@@ -131,3 +291,18 @@ class SweepData:
     @property
     def n_samples(self) -> Series:
         return self.data["n_samples"]
+
+    @property
+    def settle_time(self) -> Optional[Series]:
+        # Not available on the sweeps made with the fixed settle time
+        return self.data["settle_time"] if "settle_time" in self.data else None
+
+    @property
+    def point_amplitude(self) -> Series:
+        """The generator amplitude of every point, the level table correction
+        included. The sweeps made before it was recorded used `amplitude`.
+        """
+        if "amplitude" in self.data:
+            return self.data["amplitude"]
+
+        return pd.Series(self.amplitude, index=self.data.index, name="amplitude")
@@ -0,0 +1,92 @@
+import queue
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from audio.model.sweep import save_sample_csv
+
+
+class CaptureWriterError(Exception):
+    """Raised at the end of the sweep when some captures were not saved."""
+
+    errors: List[Tuple[Path, Exception]]
+
+    def __init__(self, errors: List[Tuple[Path, Exception]]) -> None:
+        self.errors = errors
+
+        super().__init__(
+            "{} capture files not saved: {}".format(
+                len(errors),
+                ", ".join("'{}' ({})".format(path, error) for path, error in errors),
+            )
+        )
+
+
+class CaptureWriter:
+    """Saves the captures of the sweep on a background thread, so the
+    acquisition never waits on the disk.
+
+    The queue is bounded: only if the disk is `max_pending` captures behind,
+    `write` blocks. The errors are collected and raised by `close`, at the
+    end of the sweep.
+    """
+
+    _queue: "queue.Queue[Optional[Tuple[Path, np.ndarray, float, float]]]"
+    _thread: threading.Thread
+    _errors: List[Tuple[Path, Exception]]
+
+    def __init__(self, max_pending: int = 64) -> None:
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+
+        self._thread = threading.Thread(
+            target=self._run, name="capture-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        # Don't hide the exception that is already propagating
+        if exc_type is None:
+            self.close()
+        else:
+            self.flush()
+
+    @property
+    def errors(self) -> List[Tuple[Path, Exception]]:
+        return self._errors
+
+    def write(self, path: Path, voltages: np.ndarray, frequency: float, Fs: float):
+        """Queues the capture, the parent directory is created if missing."""
+        self._queue.put((path, voltages, frequency, Fs))
+
+    def flush(self):
+        """Waits for all the queued captures to be saved."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def close(self):
+        self.flush()
+
+        if len(self._errors) > 0:
+            raise CaptureWriterError(self._errors)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+
+            if item is None:
+                break
+
+            path, voltages, frequency, Fs = item
+
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                save_sample_csv(path, voltages, frequency, Fs)
+            except Exception as e:
+                self._errors.append((path, e))
@@ -1,8 +1,20 @@
+import hashlib
+import json
+import pickle
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from math import sqrt
 from pathlib import Path
-from time import sleep
-from typing import List, Optional, Tuple
+from time import perf_counter, sleep
+from typing import Deque, Dict, List, Optional, Tuple
 
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
@@ -14,6 +26,7 @@ from rich.live import Live
 from rich.panel import Panel
 from rich.table import Column, Table
 from usbtmc import Instrument
+from audio.config.plot import PlotConfigXML
 from audio.config.sweep import SweepConfig, SweepConfigXML
 
 import audio.ui.terminal as ui_t
@@ -26,20 +39,64 @@ from audio.math.interpolation import (
     INTERPOLATION_KIND,
     logx_interpolation_model,
 )
-from audio.math.algorithm import LogarithmicScale
+from audio.math.algorithm import CoherentPlanner, LogarithmicScale
+from audio.math.ess import ess_frequency_response, exponential_sine_sweep
+from audio.math.multitone import Multitone, group_frequencies
+from audio.math.level import (
+    GENERATOR_MAX_AMPLITUDE,
+    GENERATOR_MIN_AMPLITUDE,
+    LevelSolver,
+)
 from audio.math.pid import PID_Controller, Timed_Value
-from audio.math.rms import RMS
-from audio.model.sweep import SweepData
+from audio.math.settling import SettlingDetector, SettlingResult
+from audio.math.rms import RMS, RMS_MODE
+from audio.model.archive import ARCHIVE_SUFFIX, SweepArchive
+from audio.model.capture import RawCapture
+from audio.model.level import LevelCache, LevelEntry, LevelKey, LevelTable
+from audio.model.sweep import (
+    POINT_STATUS,
+    SWEEP_COLUMNS,
+    SweepData,
+    SweepResult,
+    SweepWriter,
+)
+from audio.model.writer import CaptureWriter, CaptureWriterError
 from audio.usb.usbtmc import UsbTmc
-from audio.utility import trim_value
+from audio.utility import AcquisitionSession, trim_value
 from audio.utility.scpi import SCPI, Bandwidth, Switch
 from audio.utility.timer import Timer, Timer_Message
 
 
+# Frequency and RMS target (+4dBu) of the set level calibration
+SET_LEVEL_FREQUENCY: float = 1000
+SET_LEVEL_TARGET: float = 1.227653
+
+
+def save_sweep_csv(
+    measurements_file_path: Path,
+    amplitude_peak_to_peak: float,
+    sampling_data: pd.DataFrame,
+):
+    with open(measurements_file_path.absolute().resolve(), "w", encoding="utf-8") as f:
+        f.write("# amplitude: {}\n".format(round(amplitude_peak_to_peak, 5)))
+        sampling_data.to_csv(
+            f,
+            header=True,
+            index=None,
+        )
+
+
 def sampling_curve(
     config: SweepConfigXML,
     measurements_file_path: Path,
     debug: bool = False,
+    workers: int = 2,
+    coherent: bool = True,
+    rms_mode: RMS_MODE = RMS_MODE.FFT,
+    level_table: Optional[LevelTable] = None,
+    resume: bool = False,
+    fsync_every: int = 1,
+    raw: bool = False,
 ):
     home = measurements_file_path.parent
 
@@ -127,13 +184,10 @@ def sampling_curve(
         config.sampling.points_per_decade,
     )
 
-    frequency_list: List[float] = []
-    rms_list: List[float] = []
-    dBV_list: List[float] = []
-    fs_list: List[float] = []
-    oversampling_ratio_list: List[float] = []
-    n_periods_list: List[float] = []
-    n_samples_list: List[int] = []
+    # Raw captures, for the binary archive
+    capture_list: List[np.ndarray] = []
+    capture_frequency_list: List[float] = []
+    capture_Fs_list: List[float] = []
 
     frequency: float = round(config.sampling.frequency_min, 5)
 
@@ -144,6 +198,7 @@ def sampling_curve(
         Column(r"Input Voltage [V]", justify="right"),
         Column(r"Rms Value [V]", justify="right"),
         Column(r"Gain [dB]", justify="right"),
+        Column(r"Settle [s]", justify="right"),
         Column(r"Time [s]", justify="right"),
         title="[blue]Sweep.",
     )
@@ -165,56 +220,42 @@ def sampling_curve(
 
     console.print("before for.")
 
-    for frequency in log_scale.f_list:
-
-        # Sets the Frequency
-        generator.write(SCPI.set_source_frequency(1, round(frequency, 5)))
-
-        sleep(0.4)
-
-        Fs = trim_value(
-            frequency * config.sampling.Fs_multiplier, max_value=config.nidaq.Fs_max
+    # Continues an interrupted sweep, only the frequencies missing from the
+    # sweep file are measured
+    missing: np.ndarray = np.ones(len(log_scale.f_list), dtype=bool)
+    if resume and measurements_file_path.exists():
+        missing = log_scale.missing(SweepData(measurements_file_path).frequency.values)
+        console.print(
+            "Resuming, {} of {} points to measure.".format(
+                np.count_nonzero(missing), len(missing)
+            )
         )
+        ui_t.progress_sweep.update(task_sweep, advance=np.count_nonzero(~missing))
 
-        if Fs == config.nidaq.Fs_max:
-            config.sampling.override(number_of_samples=900)
+    resumed: bool = not np.all(missing)
 
-        oversampling_ratio = Fs / frequency
-        n_periods = config.sampling.number_of_samples / oversampling_ratio
+    # The raw captures are archived as ADC codes with the device scaling
+    scaling_coefficients: Optional[np.ndarray] = None
 
-        frequency_list.append(frequency)
-        fs_list.append(Fs)
-        oversampling_ratio_list.append(oversampling_ratio)
-        n_periods_list.append(n_periods)
-        n_samples_list.append(config.sampling.number_of_samples)
+    # One row per point of the plan, aligned even when a point fails
+    result = SweepResult(len(log_scale.f_list))
 
-        time = Timer()
-        time.start()
+    # Points acquired but not yet collected, in sweep order
+    pending: Deque[Tuple[int, Timer, Future]] = deque()
 
-        sweep_frequency_path = sweep_path / "{}".format(round(frequency, 5)).replace(
-            ".", "_", 1
-        )
-        sweep_frequency_path.mkdir(parents=True, exist_ok=True)
+    def collect_point(index: int, time: Timer, rms_future: Future):
+        nonlocal max_dB
 
-        save_file_path = sweep_frequency_path / "sample.csv"
-
-        # GET MEASUREMENTS
-        rms_value: Optional[float] = RMS.rms(
-            frequency=frequency,
-            Fs=Fs,
-            ch_input=config.nidaq.input_channel,
-            max_voltage=config.nidaq.voltage_max,
-            min_voltage=config.nidaq.voltage_min,
-            number_of_samples=config.sampling.number_of_samples,
-            time_report=False,
-            save_file=save_file_path,
-        )
+        rms_value: Optional[float] = rms_future.result()
 
         message: Timer_Message = time.stop()
 
-        if rms_value:
+        frequency, Fs, number_of_samples, settle_time, amplitude = (
+            result.column(name)[index]
+            for name in ["frequency", "fs", "n_samples", "settle_time", "amplitude"]
+        )
 
-            rms_list.append(rms_value)
+        if rms_value:
 
             ui_t.progress_sweep.update(
                 task_sweep,
@@ -222,13 +263,10 @@ def sampling_curve(
                 rms="{}".format(round(rms_value, 5)),
             )
 
-            gain_bBV: float = 20 * np.log10(
-                rms_value * 2 * np.math.sqrt(2) / config.rigol.amplitude_peak_to_peak
-            )
+            # The gain of the amplitude actually sent, level table included
+            gain_bBV: float = 20 * np.log10(rms_value * 2 * sqrt(2) / amplitude)
 
-            transfer_func_dB = transfer_function(
-                rms_value, config.rigol.amplitude_peak_to_peak / (2 * np.math.sqrt(2))
-            )
+            transfer_func_dB = transfer_function(rms_value, amplitude / (2 * sqrt(2)))
 
             if max_dB:
                 max_dB = max(abs(max_dB), abs(transfer_func_dB))
@@ -238,53 +276,260 @@ def sampling_curve(
             table.add_row(
                 "{:.2f}".format(frequency),
                 "{:.2f}".format(Fs),
-                "{}".format(900),
-                "{}".format(config.rigol.amplitude_peak_to_peak),
+                "{}".format(int(number_of_samples)),
+                "{}".format(amplitude),
                 "{:.5f} ".format(round(rms_value, 5)),
                 "[{}]{:.2f}[/]".format(
                     "red" if gain_bBV <= 0 else "green", transfer_func_dB
                 ),
+                "{:.3f}".format(settle_time),
                 "[cyan]{}[/]".format(message.elapsed_time),
             )
 
-            dBV_list.append(gain_bBV)
+            result.set(index, rms=rms_value, dBV=gain_bBV)
+            result.set_status(index, POINT_STATUS.MEASURED)
+
+            sweep_writer.append(result.row(index))
 
             ui_t.progress_sweep.update(task_sweep, advance=1)
 
         else:
+            result.set_status(index, POINT_STATUS.FAILED)
             console.print("[ERROR] - Error retrieving rms_value.", style="error")
 
-    sampling_data = pd.DataFrame(
-        list(
-            zip(
-                frequency_list,
-                rms_list,
-                dBV_list,
-                fs_list,
-                oversampling_ratio_list,
-                n_periods_list,
-                n_samples_list,
-            )
-        ),
-        columns=[
-            "frequency",
-            "rms",
-            "dBV",
-            "fs",
-            "oversampling_ratio",
-            "n_periods",
-            "n_samples",
-        ],
+    def collect_done(wait: bool = False):
+        # Results are consumed in order, so the table and the sweep file
+        # keep the sweep order even if the workers finish out of order.
+        while len(pending) > 0 and (wait or pending[0][-1].done()):
+            collect_point(*pending.popleft())
+
+    settling = SettlingDetector(
+        tolerance=config.sampling.settle_tolerance,
+        timeout=config.sampling.settle_timeout,
     )
 
-    with open(measurements_file_path.absolute().resolve(), "w", encoding="utf-8") as f:
-        f.write(
-            "# amplitude: {}\n".format(round(config.rigol.amplitude_peak_to_peak, 5))
+    planner = CoherentPlanner(
+        Fs_multiplier=config.sampling.Fs_multiplier,
+        Fs_max=config.nidaq.Fs_max,
+    )
+
+    # Generator amplitude of every point, pre-compensated with the level table
+    amplitude_list: List[float] = list(
+        np.full(len(log_scale.f_list), config.rigol.amplitude_peak_to_peak)
+    )
+    if level_table is not None:
+        corrected = config.rigol.amplitude_peak_to_peak * level_table.correction(
+            log_scale.f_list
         )
-        sampling_data.to_csv(
-            f,
-            header=True,
-            index=None,
+
+        # Bounded to the generator limits, as the LevelSolver
+        out_of_range = np.count_nonzero(
+            (corrected < GENERATOR_MIN_AMPLITUDE)
+            | (corrected > GENERATOR_MAX_AMPLITUDE)
+        )
+
+        if out_of_range > 0:
+            console.print(
+                "[WARNING] - {} corrected amplitudes limited to {}-{} Vpp.".format(
+                    out_of_range, GENERATOR_MIN_AMPLITUDE, GENERATOR_MAX_AMPLITUDE
+                ),
+                style="warning",
+            )
+
+        amplitude_list = list(
+            np.round(
+                np.clip(corrected, GENERATOR_MIN_AMPLITUDE, GENERATOR_MAX_AMPLITUDE),
+                5,
+            )
+        )
+
+        # The DUT output expected from the level table, against the DAQ range
+        expected_peak = np.sqrt(2) * level_table.expected_rms(
+            log_scale.f_list, amplitude_list
+        )
+        over_range = np.count_nonzero(
+            (expected_peak > config.nidaq.voltage_max)
+            | (-expected_peak < config.nidaq.voltage_min)
+        )
+
+        if over_range > 0:
+            console.print(
+                "[WARNING] - {} points expected over the DAQ range {}-{} V.".format(
+                    over_range, config.nidaq.voltage_min, config.nidaq.voltage_max
+                ),
+                style="warning",
+            )
+
+    try:
+        # One NI-DAQmx Task for the whole sweep, every point is appended
+        # to the sweep file as soon as it's measured
+        with AcquisitionSession(
+            ch_input=config.nidaq.input_channel,
+            min_voltage=config.nidaq.voltage_min,
+            max_voltage=config.nidaq.voltage_max,
+            raw=raw,
+        ) as daq_session, SweepWriter(
+            measurements_file_path,
+            config.rigol.amplitude_peak_to_peak,
+            SWEEP_COLUMNS,
+            fsync_every=fsync_every,
+            resume=resume,
+        ) as sweep_writer:
+            scaling_coefficients = daq_session.scaling_coefficients
+
+            # The DSP and the file writes of point N run on the workers
+            # while the generator is retuned and the DAQ captures point N+1.
+            with ThreadPoolExecutor(
+                max_workers=workers
+            ) as executor, CaptureWriter() as capture_writer:
+                for index in np.flatnonzero(missing).tolist():
+                    target_frequency = log_scale.f_list[index]
+                    amplitude = amplitude_list[index]
+
+                    Fs = trim_value(
+                        target_frequency * config.sampling.Fs_multiplier,
+                        max_value=config.nidaq.Fs_max,
+                    )
+
+                    if Fs == config.nidaq.Fs_max:
+                        config.sampling.override(number_of_samples=900)
+
+                    frequency: float = target_frequency
+                    number_of_samples: int = config.sampling.number_of_samples
+                    oversampling_ratio = Fs / frequency
+                    n_periods = number_of_samples / oversampling_ratio
+
+                    if coherent:
+                        # Integer number of periods in the capture, the generator
+                        # frequency is slightly nudged if needed
+                        point = planner.plan(target_frequency, number_of_samples)
+
+                        try:
+                            daq_session.configure(point.Fs, point.number_of_samples)
+
+                            # Re-plan on the sampling rate coerced by the device
+                            if daq_session.sample_rate != point.Fs:
+                                point = planner.plan(
+                                    target_frequency,
+                                    number_of_samples,
+                                    Fs=daq_session.sample_rate,
+                                )
+                        except Exception as e:
+                            console.log(e)
+
+                        frequency = point.generator_frequency
+                        Fs = point.Fs
+                        number_of_samples = point.number_of_samples
+                        oversampling_ratio = point.oversampling_ratio
+                        n_periods = point.n_periods
+
+                    # Sets the Frequency
+                    if level_table is not None:
+                        generator.write(SCPI.set_source_voltage_amplitude(1, amplitude))
+                    generator.write(SCPI.set_source_frequency(1, round(frequency, 5)))
+                    retune_time = perf_counter()
+
+                    # Waits for the generator and the DUT with short pre-captures
+                    settle_time: float = wait_settling(
+                        settling, daq_session, frequency, Fs, start_time=retune_time
+                    )
+
+                    result.set(
+                        index,
+                        frequency=frequency,
+                        fs=Fs,
+                        oversampling_ratio=oversampling_ratio,
+                        n_periods=n_periods,
+                        n_samples=number_of_samples,
+                        settle_time=settle_time,
+                        amplitude=amplitude,
+                    )
+
+                    time = Timer()
+                    time.start()
+
+                    sweep_frequency_path = sweep_path / "{}".format(
+                        round(frequency, 5)
+                    ).replace(".", "_", 1)
+
+                    save_file_path = sweep_frequency_path / "sample.csv"
+
+                    # GET MEASUREMENTS
+                    raw_capture: Optional[RawCapture] = None
+                    try:
+                        if raw:
+                            raw_capture = daq_session.read_capture(
+                                frequency=frequency,
+                                Fs=Fs,
+                                number_of_samples=number_of_samples,
+                            )
+                            voltages = raw_capture.voltages
+                        else:
+                            voltages = daq_session.read_voltages(
+                                frequency=frequency,
+                                Fs=Fs,
+                                number_of_samples=number_of_samples,
+                            )
+                    except Exception as e:
+                        console.log(e)
+                        voltages = None
+
+                    if voltages is not None:
+                        capture_list.append(
+                            raw_capture.codes if raw_capture else voltages
+                        )
+                        capture_frequency_list.append(frequency)
+                        capture_Fs_list.append(Fs)
+
+                        # The codes of a raw sweep are only in the archive
+                        if not raw:
+                            capture_writer.write(
+                                save_file_path, voltages, frequency, Fs
+                            )
+
+                        rms_future: Future = executor.submit(
+                            RMS.rms_from_voltages,
+                            voltages,
+                            frequency=frequency,
+                            Fs=Fs,
+                            time_report=False,
+                            rms_mode=rms_mode,
+                            trim=not coherent,
+                        )
+                    else:
+                        rms_future = Future()
+                        rms_future.set_result(None)
+
+                    pending.append((index, time, rms_future))
+
+                    collect_done()
+
+                collect_done(wait=True)
+    except CaptureWriterError as e:
+        # The sweep is complete, only some capture files are missing
+        console.print(f"[ERROR] - {e}", style="error")
+
+    if resumed:
+        # The gaps were appended at the end, the rows are sorted back
+        sweep_data = SweepData(measurements_file_path)
+        save_sweep_csv(
+            measurements_file_path,
+            sweep_data.amplitude,
+            sweep_data.data.sort_values("frequency").rename(columns={"Fs": "fs"}),
+        )
+
+        # The captures of the interrupted run are only on the CSV tree
+        SweepArchive.from_csv_tree(measurements_file_path)
+    else:
+        SweepArchive.write(
+            measurements_file_path.with_suffix(ARCHIVE_SUFFIX),
+            result.to_dataframe().rename(columns={"fs": "Fs"}),
+            captures=capture_list,
+            capture_frequency=capture_frequency_list,
+            capture_Fs=capture_Fs_list,
+            # Nominal, the amplitude sent at every point is a column
+            attributes={"amplitude": config.rigol.amplitude_peak_to_peak},
+            scaling_coefficients=scaling_coefficients,
         )
 
     if debug:
@@ -316,15 +561,396 @@ def sampling_curve(
     live.stop()
 
 
-def plot_from_csv(
+def sampling_curve_ess(
+    config: SweepConfigXML,
     measurements_file_path: Path,
-    plot_file_path: Path,
-    sweep_config: SweepConfigXML,
+    duration: float = 2.0,
     debug: bool = False,
 ):
+    """Measures the whole frequency response with one capture of a looped
+    Exponential Sine Sweep, uploaded to the generator as arbitrary waveform.
+    Writes the same `sweep.csv` as `sampling_curve`.
+    """
+
+    live_group = Group(Panel(ui_t.progress_list_task))
+    live = Live(
+        live_group,
+        transient=True,
+        console=console,
+    )
+    live.start()
+
+    task_sampling = ui_t.progress_list_task.add_task(
+        "Sampling ESS", start=False, task="Retrieving Devices"
+    )
+    ui_t.progress_list_task.start_task(task_sampling)
+
+    list_devices: List[Instrument] = UsbTmc.search_devices()
+    if debug:
+        UsbTmc.print_devices_list(list_devices)
+
+    generator: UsbTmc = UsbTmc(list_devices[0])
+    generator.open()
+
+    amplitude_peak_to_peak: float = config.rigol.amplitude_peak_to_peak
+    Fs: float = config.nidaq.Fs_max
+
+    log_scale: LogarithmicScale = LogarithmicScale(
+        config.sampling.frequency_min,
+        config.sampling.frequency_max,
+        config.sampling.points_per_decade,
+    )
+
+    # The sweep covers the band with some margin, for the fades
+    reference = exponential_sine_sweep(
+        f_start=config.sampling.frequency_min / 2,
+        f_stop=min(config.sampling.frequency_max * 2, 0.45 * Fs),
+        duration=duration,
+        Fs=Fs,
+    )
+    loop_time: float = len(reference) / Fs
+
+    ui_t.progress_list_task.update(task_sampling, task="Uploading Sweep")
+
+    SCPI.exec_commands(
+        generator,
+        [
+            SCPI.reset(),
+            SCPI.clear(),
+            SCPI.set_output(1, Switch.OFF),
+        ],
+    )
+
+    SCPI.exec_arbitrary_waveform(generator, 1, reference)
+
+    # The whole waveform is played once per period, at the DAQ sampling rate
+    SCPI.exec_commands(
+        generator,
+        [
+            SCPI.set_source_frequency(1, 1 / loop_time),
+            SCPI.set_source_voltage_amplitude(1, round(amplitude_peak_to_peak, 5)),
+            SCPI.set_output(1, Switch.ON),
+        ],
+    )
+
+    ui_t.progress_list_task.update(task_sampling, task="Sampling")
+
+    # One loop to reach the steady state
+    sleep(loop_time)
+
+    with AcquisitionSession(
+        ch_input=config.nidaq.input_channel,
+        min_voltage=config.nidaq.voltage_min,
+        max_voltage=config.nidaq.voltage_max,
+    ) as daq_session:
+        voltages = daq_session.read_voltages(
+            frequency=config.sampling.frequency_max,
+            Fs=Fs,
+            number_of_samples=len(reference),
+        )
+
+    SCPI.exec_commands(
+        generator,
+        [
+            SCPI.set_output(1, Switch.OFF),
+            SCPI.clear(),
+        ],
+    )
+    generator.close()
+
+    ui_t.progress_list_task.update(task_sampling, task="Deconvolution")
+
+    gain = ess_frequency_response(
+        voltages,
+        reference * amplitude_peak_to_peak / 2,
+        Fs=Fs,
+        frequencies=log_scale.f_list,
+    )
+
+    frequency = np.array(log_scale.f_list)
+    oversampling_ratio = Fs / frequency
+
+    sampling_data = pd.DataFrame(
+        {
+            "frequency": frequency,
+            "rms": gain * amplitude_peak_to_peak / (2 * sqrt(2)),
+            "dBV": 20 * np.log10(gain),
+            "fs": Fs,
+            "oversampling_ratio": oversampling_ratio,
+            "n_periods": len(reference) / oversampling_ratio,
+            "n_samples": len(reference),
+            "settle_time": loop_time,
+            "amplitude": amplitude_peak_to_peak,
+        },
+        columns=SWEEP_COLUMNS,
+    )
+
+    save_sweep_csv(measurements_file_path, amplitude_peak_to_peak, sampling_data)
+
+    ui_t.progress_list_task.remove_task(task_sampling)
+
+    live.stop()
+
+    console.print(
+        Panel(
+            f'[bold][[blue]FILE[/blue] - [cyan]CSV[/cyan]][/bold] - "[bold green]{measurements_file_path.absolute()}[/bold green]"'
+        )
+    )
+
+
+def sampling_curve_multitone(
+    config: SweepConfigXML,
+    measurements_file_path: Path,
+    tones_per_group: int = 16,
+    frequency_resolution: float = 1.0,
+    debug: bool = False,
+):
+    """Measures the frequency response with multitones uploaded to the
+    generator as arbitrary waveform, one capture per group of tones.
+    Every tone RMS comes from the same FFT of the capture.
+    Writes the same `sweep.csv` as `sampling_curve`.
+    """
+
+    live_group = Group(
+        Panel(
+            Group(
+                ui_t.progress_list_task,
+                ui_t.progress_sweep,
+            )
+        ),
+    )
+    live = Live(
+        live_group,
+        transient=True,
+        console=console,
+    )
+    live.start()
+
+    task_sampling = ui_t.progress_list_task.add_task(
+        "Sampling Multitone", start=False, task="Retrieving Devices"
+    )
+    ui_t.progress_list_task.start_task(task_sampling)
+
+    list_devices: List[Instrument] = UsbTmc.search_devices()
+    if debug:
+        UsbTmc.print_devices_list(list_devices)
+
+    generator: UsbTmc = UsbTmc(list_devices[0])
+    generator.open()
+
+    SCPI.exec_commands(
+        generator,
+        [
+            SCPI.reset(),
+            SCPI.clear(),
+            SCPI.set_output(1, Switch.OFF),
+        ],
+    )
+
+    amplitude_peak_to_peak: float = config.rigol.amplitude_peak_to_peak
+    Fs: float = config.nidaq.Fs_max
+
+    # Every tone is on an exact bin of the capture
+    number_of_samples = int(round(Fs / frequency_resolution))
+    loop_time: float = number_of_samples / Fs
+
+    log_scale: LogarithmicScale = LogarithmicScale(
+        config.sampling.frequency_min,
+        config.sampling.frequency_max,
+        config.sampling.points_per_decade,
+    )
+
+    groups = group_frequencies(log_scale.f_list, tones_per_group)
+
+    ui_t.progress_list_task.update(task_sampling, task="Sweep")
+
+    task_sweep = ui_t.progress_sweep.add_task(
+        "Multitone",
+        start=False,
+        total=len(groups),
+        frequency="",
+        rms="",
+    )
+    ui_t.progress_sweep.start_task(task_sweep)
+
+    frequency_list: List[np.ndarray] = []
+    rms_list: List[np.ndarray] = []
+    dBV_list: List[np.ndarray] = []
+
+    with AcquisitionSession(
+        ch_input=config.nidaq.input_channel,
+        min_voltage=config.nidaq.voltage_min,
+        max_voltage=config.nidaq.voltage_max,
+    ) as daq_session:
+
+        for idx, group in enumerate(groups):
+
+            multitone = Multitone.from_frequencies(group, Fs, number_of_samples)
 
-    plot_config = sweep_config.plot
+            SCPI.exec_arbitrary_waveform(generator, 1, multitone.waveform())
 
+            # The whole multitone is played once per period
+            SCPI.exec_commands(
+                generator,
+                [
+                    SCPI.set_source_frequency(1, 1 / loop_time),
+                    SCPI.set_source_voltage_amplitude(
+                        1, round(amplitude_peak_to_peak, 5)
+                    ),
+                    SCPI.set_output(1, Switch.ON),
+                ],
+            )
+
+            # One loop to reach the steady state
+            sleep(loop_time)
+
+            voltages = daq_session.read_voltages(
+                frequency=max(multitone.frequencies),
+                Fs=Fs,
+                number_of_samples=number_of_samples,
+            )
+
+            rms_tones = RMS.fft_bins(voltages, multitone.bins)
+
+            input_rms = multitone.amplitude * amplitude_peak_to_peak / (2 * sqrt(2))
+            gain_dB = np.array(
+                [transfer_function(rms, input_rms) for rms in rms_tones]
+            )
+
+            frequency_list.append(multitone.frequencies)
+            dBV_list.append(gain_dB)
+            # RMS of a full amplitude sine, as `sampling_curve`
+            rms_list.append(
+                np.power(10, gain_dB / 20) * amplitude_peak_to_peak / (2 * sqrt(2))
+            )
+
+            ui_t.progress_sweep.update(
+                task_sweep,
+                frequency=f"group {idx + 1}/{len(groups)}",
+                rms="crest factor {:.2f}".format(multitone.crest_factor),
+                advance=1,
+            )
+
+    SCPI.exec_commands(
+        generator,
+        [
+            SCPI.set_output(1, Switch.OFF),
+            SCPI.clear(),
+        ],
+    )
+    generator.close()
+
+    frequency = np.concatenate(frequency_list)
+    order = np.argsort(frequency)
+    frequency = frequency[order]
+    oversampling_ratio = Fs / frequency
+
+    sampling_data = pd.DataFrame(
+        {
+            "frequency": frequency,
+            "rms": np.concatenate(rms_list)[order],
+            "dBV": np.concatenate(dBV_list)[order],
+            "fs": Fs,
+            "oversampling_ratio": oversampling_ratio,
+            "n_periods": number_of_samples / oversampling_ratio,
+            "n_samples": number_of_samples,
+            "settle_time": loop_time,
+            "amplitude": amplitude_peak_to_peak,
+        },
+        columns=SWEEP_COLUMNS,
+    )
+
+    save_sweep_csv(measurements_file_path, amplitude_peak_to_peak, sampling_data)
+
+    ui_t.progress_sweep.remove_task(task_sweep)
+    ui_t.progress_list_task.remove_task(task_sampling)
+
+    live.stop()
+
+    console.print(
+        Panel(
+            f'[bold][[blue]FILE[/blue] - [cyan]CSV[/cyan]][/bold] - "[bold green]{measurements_file_path.absolute()}[/bold green]"'
+        )
+    )
+
+
+def wait_settling(
+    settling: SettlingDetector,
+    session: AcquisitionSession,
+    frequency: float,
+    Fs: float,
+    start_time: Optional[float] = None,
+) -> float:
+    """Waits for the signal to settle, returns the settle time used [s].
+    If the pre-captures fail, falls back to a fixed sleep of the timeout.
+    """
+    if start_time is None:
+        start_time = perf_counter()
+
+    try:
+        result: SettlingResult = settling.wait_session(
+            session, frequency, Fs, start_time=start_time
+        )
+
+        if not result.settled:
+            console.print(
+                "[SETTLING] - Timeout at {} Hz after {:.3f} s.".format(
+                    round(frequency, 5), result.settle_time
+                ),
+                style="warning",
+            )
+
+        return result.settle_time
+    except Exception as e:
+        console.log(e)
+
+        sleep(max(0, settling.timeout - (perf_counter() - start_time)))
+
+        return perf_counter() - start_time
+
+
+RASTER_FORMATS: Tuple[str, ...] = ("png", "jpg", "jpeg", "tif", "tiff", "webp")
+
+# Draft render: a quarter of the canvas side, lines and fonts scaled with it
+PREVIEW_SCALE: float = 0.25
+PREVIEW_DPI: int = 72
+
+
+def _log_minor_format(x, pos):
+    return "{:.0f}".format(x)
+
+
+def _save_figure(figure_pickle: bytes, plot_file_path: Path) -> Path:
+    figure: Figure = pickle.loads(figure_pickle)
+    figure.savefig(plot_file_path)
+    plt.close(figure)
+
+    return plot_file_path
+
+
+def plot_from_csv(
+    measurements_file_path: Path,
+    plot_file_path: Path,
+    plot_config: PlotConfigXML,
+    debug: bool = False,
+    formats: Optional[List[str]] = None,
+    parallel: bool = False,
+    preview: bool = False,
+) -> List[Path]:
+    """Plots the frequency response of the sweep.
+
+    The figure is built once and saved in every format of `formats`, the
+    suffix of `plot_file_path` is replaced by each of them. With `parallel`
+    the raster formats are saved in other processes, while the vector ones
+    are saved here.
+
+    `preview` is a draft for an immediate feedback: a small canvas at a low
+    dpi without `tight_layout`, the axes and the locators are the same of
+    the full figure.
+
+    Returns:
+        List[Path]: The plot files
+    """
     live_group = Group(Panel(ui_t.progress_list_task))
 
     live = Live(
@@ -363,8 +989,15 @@ def plot_from_csv(
 
     ui_t.progress_list_task.update(task_plotting, task="Interpolate")
 
+    scale: float = PREVIEW_SCALE if preview else 1
+
+    if preview:
+        dpi = PREVIEW_DPI
+    else:
+        dpi = plot_config.dpi if plot_config.dpi else 300
+
     plot: Tuple[Figure, Axes] = plt.subplots(
-        figsize=(16 * 2, 9 * 2), dpi=plot_config.dpi if plot_config.dpi else 300
+        figsize=(16 * 2 * scale, 9 * 2 * scale), dpi=dpi
     )
 
     fig: Figure
@@ -394,7 +1027,7 @@ def plot_from_csv(
     axes.semilogx(
         *xy_sampled,
         *xy_interpolated,
-        linewidth=4,
+        linewidth=4 * scale,
     )
     # Added Line to y = -3
     axes.plot(
@@ -406,22 +1039,22 @@ def plot_from_csv(
 
     axes.set_title(
         "Frequency response",
-        fontsize=50,
+        fontsize=50 * scale,
     )
     axes.set_xlabel(
         "Frequency ($Hz$)",
-        fontsize=40,
+        fontsize=40 * scale,
     )
     axes.set_ylabel(
         "Amplitude ($dB$) ($0 \, dB = {} \, Vpp$)".format(
             round(plot_config.y_offset, 5) if plot_config.y_offset else 0
         ),
-        fontsize=40,
+        fontsize=40 * scale,
     )
 
     axes.tick_params(
         axis="both",
-        labelsize=22,
+        labelsize=22 * scale,
     )
     axes.tick_params(axis="x", rotation=90)
 
@@ -432,10 +1065,8 @@ def plot_from_csv(
 
     logLocator = ticker.LogLocator(subs=np.arange(0, 1, granularity_ticks))
 
-    def logMinorFormatFunc(x, pos):
-        return "{:.0f}".format(x)
-
-    logMinorFormat = ticker.FuncFormatter(logMinorFormatFunc)
+    # Module level, the figure is pickled by the parallel save
+    logMinorFormat = ticker.FuncFormatter(_log_minor_format)
 
     # X Axis - Major
     axes.xaxis.set_major_locator(logLocator)
@@ -453,38 +1084,281 @@ def plot_from_csv(
             max_y_dBV + 1,
         )
 
-    plt.tight_layout()
+    # The slowest step of a small figure, the draft has fixed margins
+    if preview:
+        fig.subplots_adjust(left=0.1, right=0.97, bottom=0.2, top=0.9)
+    else:
+        fig.tight_layout()
 
-    plt.savefig(plot_file_path)
+    ui_t.progress_list_task.update(task_plotting, task="Saving Graph")
 
-    console.print(
-        Panel(
-            '[bold][[blue]FILE[/blue] - [cyan]GRAPH[/cyan]][/bold] - "[bold green]{}[/bold green]"'.format(
-                plot_file_path.absolute().resolve()
+    plot_files: List[Path] = (
+        [plot_file_path.with_suffix("." + format.lower()) for format in formats]
+        if formats
+        else [plot_file_path]
+    )
+
+    raster_files: List[Path] = [
+        file
+        for file in plot_files
+        if parallel and file.suffix[1:].lower() in RASTER_FORMATS
+    ]
+
+    if len(raster_files) > 0:
+        figure_pickle = pickle.dumps(fig)
+
+        # Agg in the workers too, as the plot-all and sweep-debug pools
+        with ProcessPoolExecutor(
+            max_workers=len(raster_files), initializer=plot_process_init
+        ) as executor:
+            futures = [
+                executor.submit(_save_figure, figure_pickle, file)
+                for file in raster_files
+            ]
+
+            for file in plot_files:
+                if file not in raster_files:
+                    fig.savefig(file)
+
+            for future in futures:
+                future.result()
+    else:
+        for file in plot_files:
+            fig.savefig(file)
+
+    plt.close(fig)
+
+    for file in plot_files:
+        console.print(
+            Panel(
+                '[bold][[blue]FILE[/blue] - [cyan]GRAPH[/cyan]][/bold] - "[bold green]{}[/bold green]"'.format(
+                    file.absolute().resolve()
+                )
             )
         )
-    )
 
     ui_t.progress_list_task.remove_task(task_plotting)
 
     live.stop()
 
+    return plot_files
+
+
+PLOT_STAMP_SUFFIX: str = ".plot.json"
+
+
+def plot_base_path(measurements_file_path: Path, preview: bool = False) -> Path:
+    """The plot file of the sweep without the format: "sweep" next to
+    "sweep.csv", "sweep.preview" for a draft."""
+    base_path = measurements_file_path.with_suffix("")
+
+    if preview:
+        # The suffix is replaced by the format
+        base_path = base_path.with_name(base_path.name + ".preview.png")
+
+    return base_path
+
+
+def plot_config_hash(plot_config: PlotConfigXML) -> str:
+    return hashlib.sha256(
+        ET.tostring(plot_config.get_node(), encoding="utf-8")
+    ).hexdigest()
+
+
+def _plot_stamp(
+    measurements_file_path: Path,
+    plot_config: PlotConfigXML,
+    formats: List[str],
+    preview: bool,
+) -> Dict:
+    return {
+        "csv": hashlib.sha256(measurements_file_path.read_bytes()).hexdigest(),
+        "config": plot_config_hash(plot_config),
+        "formats": sorted(format.lower() for format in formats),
+        "preview": preview,
+    }
+
+
+def _plot_stamp_path(measurements_file_path: Path, preview: bool) -> Path:
+    return plot_base_path(measurements_file_path, preview).with_suffix(
+        PLOT_STAMP_SUFFIX
+    )
+
+
+def plot_process_init():
+    # Non interactive, and the plot panels of many processes would interleave
+    matplotlib.use("Agg")
+    console.quiet = True
+
+
+def _plot_worker(
+    measurements_file_path: Path,
+    plot_config_xml: str,
+    formats: List[str],
+    preview: bool,
+) -> List[Path]:
+    return plot_from_csv(
+        measurements_file_path,
+        plot_base_path(measurements_file_path, preview),
+        PlotConfigXML(ET.ElementTree(ET.fromstring(plot_config_xml))),
+        formats=formats,
+        preview=preview,
+    )
+
+
+def plot_all(
+    measurements_file_paths: List[Path],
+    plot_config: PlotConfigXML,
+    formats: List[str],
+    workers: Optional[int] = None,
+    force: bool = False,
+    preview: bool = False,
+) -> Tuple[List[Path], List[Path], List[Tuple[Path, Exception]]]:
+    """Plots many sweeps with a process pool, one sweep per task.
+
+    A stamp next to the plots records the hash of the CSV and of the plot
+    configuration, a sweep with the same stamp and all the plot files is
+    skipped unless `force`.
+
+    Returns:
+        Tuple[List[Path], List[Path], List[Tuple[Path, Exception]]]: The sweep
+        files plotted, the ones skipped and the failed ones with the error
+    """
+    plotted: List[Path] = []
+    skipped: List[Path] = []
+    failed: List[Tuple[Path, Exception]] = []
+
+    stamps: Dict[Path, Dict] = {}
+
+    for measurements_file_path in measurements_file_paths:
+        stamp = _plot_stamp(measurements_file_path, plot_config, formats, preview)
+        stamp_path = _plot_stamp_path(measurements_file_path, preview)
+
+        plot_files = [
+            plot_base_path(measurements_file_path, preview).with_suffix(
+                "." + format.lower()
+            )
+            for format in formats
+        ]
+
+        if (
+            not force
+            and stamp_path.exists()
+            and all(file.exists() for file in plot_files)
+            and json.loads(stamp_path.read_text(encoding="utf-8")) == stamp
+        ):
+            skipped.append(measurements_file_path)
+        else:
+            stamps[measurements_file_path] = stamp
+
+    if len(stamps) == 0:
+        return plotted, skipped, failed
+
+    plot_config_xml = ET.tostring(plot_config.get_node(), encoding="unicode")
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=plot_process_init
+    ) as executor:
+        futures = {
+            executor.submit(
+                _plot_worker, measurements_file_path, plot_config_xml, formats, preview
+            ): measurements_file_path
+            for measurements_file_path in stamps
+        }
+
+        task = ui_t.progress_files.add_task("Plot", total=len(futures), file="")
+
+        with Live(Panel(ui_t.progress_files), transient=True, console=console):
+            for future in as_completed(futures):
+                measurements_file_path = futures[future]
+
+                try:
+                    future.result()
+
+                    _plot_stamp_path(measurements_file_path, preview).write_text(
+                        json.dumps(stamps[measurements_file_path], indent=2),
+                        encoding="utf-8",
+                    )
+                    plotted.append(measurements_file_path)
+                except Exception as e:
+                    failed.append((measurements_file_path, e))
+
+                ui_t.progress_files.update(
+                    task, advance=1, file=str(measurements_file_path.parent)
+                )
+
+        ui_t.progress_files.remove_task(task)
+
+    return plotted, skipped, failed
+
+
+def generator_identity(generator: Optional[UsbTmc] = None) -> str:
+    """The identification string of the generator, part of the level cache
+    key. Without `generator` the first instrument found is queried.
+    """
+    opened: bool = generator is None
+
+    try:
+        if generator is None:
+            generator = UsbTmc(UsbTmc.search_devices()[0])
+            generator.open()
+
+        return str(generator.query_identification()).strip()
+    except Exception as e:
+        console.log(e)
+
+        return "unknown"
+    finally:
+        if opened and generator is not None:
+            generator.close()
+
+
+def set_level_key(
+    generator_identity: str,
+    channel: str,
+    serial: Optional[str] = None,
+) -> LevelKey:
+    """The level cache key of a `config_set_level` calibration."""
+    return LevelKey(
+        generator=generator_identity,
+        channel=channel,
+        frequency=SET_LEVEL_FREQUENCY,
+        target=SET_LEVEL_TARGET,
+        serial=serial,
+    )
+
 
 def config_set_level(
     config: SweepConfigXML,
     plot_file_path: Path,
     set_level_file_path: Optional[Path] = None,
+    model: bool = True,
+    cache: Optional[LevelCache] = None,
+    serial: Optional[str] = None,
     debug: bool = False,
-):
+) -> Optional[float]:
+    """Searches the generator amplitude that gives +4dBu at the DUT output.
+
+    With `model` the amplitude is predicted from the gain measured at the
+    first acquisition and refined with bounded secant steps, the PID is
+    used only if the prediction fails.
+
+    With a `cache`, a still valid calibration of the same generator, channel
+    and DUT `serial` is the starting amplitude: when its first measurement
+    is already within tolerance no other acquisition is needed.
+
+    Returns:
+        Optional[float]: The generator amplitude found
+    """
 
     voltage_amplitude_start: float = 0.01
     voltage_amplitude = voltage_amplitude_start
-    frequency = 1000
+    frequency = SET_LEVEL_FREQUENCY
     Fs = trim_value(
         frequency * config.sampling.Fs_multiplier, max_value=config.nidaq.Fs_max
     )
     diff_voltage = 0.001
-    Vpp_4dBu_exact = 1.227653
+    Vpp_4dBu_exact = SET_LEVEL_TARGET
 
     table = Table(
         Column("Iteration", justify="right"),
@@ -537,6 +1411,20 @@ def config_set_level(
     # Auto Close with the destructor
     generator.open()
 
+    level_key: Optional[LevelKey] = None
+    cached: Optional[LevelEntry] = None
+
+    if cache is not None:
+        level_key = set_level_key(
+            generator_identity(generator), config.nidaq.input_channel, serial
+        )
+        cached = cache.get(level_key)
+
+        if cached is not None:
+            # Verification measurement at the cached amplitude
+            voltage_amplitude_start = cached.level_offset
+            voltage_amplitude = voltage_amplitude_start
+
     # Sets the Configuration for the Voltmeter
     # Frequency: 1000
     generator_configs: list = [
@@ -577,120 +1465,155 @@ def config_set_level(
 
     level_offset: Optional[float] = None
 
-    while not Vpp_found:
+    level_solver: Optional[LevelSolver] = None
+    if model:
+        level_solver = LevelSolver(target=Vpp_4dBu_exact)
 
-        # GET MEASUREMENTS
-        rms_value: Optional[float] = RMS.rms(
-            frequency=frequency,
-            Fs=Fs,
-            ch_input=config.nidaq.input_channel,
-            max_voltage=config.nidaq.voltage_max,
-            min_voltage=config.nidaq.voltage_min,
-            number_of_samples=config.sampling.number_of_samples,
-            # interpolation_rate=config.plot.interpolation_rate,
-            time_report=False,
-        )
+    settling = SettlingDetector(
+        tolerance=config.sampling.settle_tolerance,
+        timeout=config.sampling.settle_timeout,
+    )
 
-        if rms_value:
+    with AcquisitionSession(
+        ch_input=config.nidaq.input_channel,
+        min_voltage=config.nidaq.voltage_min,
+        max_voltage=config.nidaq.voltage_max,
+    ) as daq_session:
+        while not Vpp_found:
+
+            # GET MEASUREMENTS
+            rms_value: Optional[float] = RMS.rms(
+                frequency=frequency,
+                Fs=Fs,
+                ch_input=config.nidaq.input_channel,
+                max_voltage=config.nidaq.voltage_max,
+                min_voltage=config.nidaq.voltage_min,
+                number_of_samples=config.sampling.number_of_samples,
+                # interpolation_rate=config.plot.interpolation_rate,
+                time_report=False,
+                session=daq_session,
+            )
 
-            if not gain_apparato:
-                gain_apparato = rms_value / voltage_amplitude_start
-                pid.controller_gain = k_tot / gain_apparato
+            if rms_value:
+                if not gain_apparato:
+                    gain_apparato = rms_value / voltage_amplitude_start
+                    pid.controller_gain = k_tot / gain_apparato
 
-            pid.add_process_variable(rms_value)
+                # No timestamp: one step per iteration, the gains are tuned for it
+                pid.add_process_variable(Timed_Value(rms_value))
 
-            error: float = Vpp_4dBu_exact - rms_value
+                error: float = Vpp_4dBu_exact - rms_value
 
-            pid.add_error(Timed_Value(error))
+                pid.add_error(Timed_Value(error))
 
-            error_percentage: float = percentage_error(
-                exact=Vpp_4dBu_exact, approx=rms_value
-            )
+                error_percentage: float = percentage_error(
+                    exact=Vpp_4dBu_exact, approx=rms_value
+                )
 
-            gain_dB: float = 20 * np.log10(
-                rms_value / (voltage_amplitude / (2 * sqrt(2)))
-            )
+                gain_dB: float = 20 * np.log10(
+                    rms_value / (voltage_amplitude / (2 * sqrt(2)))
+                )
 
-            gain_dB_list.append(gain_dB)
+                gain_dB_list.append(gain_dB)
 
-            table.add_row(
-                f"{iteration}",
-                f"{Vpp_4dBu_exact:.8f}",
-                f"{voltage_amplitude:.8f}",
-                f"{rms_value:.8f}",
-                "[{}]{:+.8f}[/]".format(
-                    "red" if error > diff_voltage else "green",
-                    error,
-                ),
-                "[{}]{:+.8f}[/]".format(
-                    "red" if gain_dB < 0 else "green",
-                    gain_dB,
-                ),
-                f"{pid.term.proportional[-1]:+.8f}",
-                f"{pid.term.integral[-1]:+.8f}",
-                f"{pid.term.derivative[-1]:+.8f}",
-                "[{}]{:+.5%}[/]".format(
-                    "red" if error > diff_voltage else "green",
-                    error_percentage,
-                ),
-            )
+                table.add_row(
+                    f"{iteration}",
+                    f"{Vpp_4dBu_exact:.8f}",
+                    f"{voltage_amplitude:.8f}",
+                    f"{rms_value:.8f}",
+                    "[{}]{:+.8f}[/]".format(
+                        "red" if error > diff_voltage else "green",
+                        error,
+                    ),
+                    "[{}]{:+.8f}[/]".format(
+                        "red" if gain_dB < 0 else "green",
+                        gain_dB,
+                    ),
+                    f"{pid.term.proportional[-1]:+.8f}",
+                    f"{pid.term.integral[-1]:+.8f}",
+                    f"{pid.term.derivative[-1]:+.8f}",
+                    "[{}]{:+.5%}[/]".format(
+                        "red" if error > diff_voltage else "green",
+                        error_percentage,
+                    ),
+                )
 
-            if pid.check_limit_diff(error, diff_voltage):
-                Vpp_found = True
-                level_offset = voltage_amplitude
+                if pid.check_limit_diff(error, diff_voltage):
+                    Vpp_found = True
+                    level_offset = voltage_amplitude
 
-                table_result = Table(
-                    "Gain Apparato",
-                    "Kc",
-                    "tauI",
-                    "tauD",
-                    "steps",
-                )
+                    table_result = Table(
+                        "Gain Apparato",
+                        "Kc",
+                        "tauI",
+                        "tauD",
+                        "steps",
+                    )
 
-                table_result.add_row(
-                    f"{rms_value / voltage_amplitude:.8f}",
-                    f"{pid.controller_gain}",
-                    f"{pid.tauI}",
-                    f"{pid.tauD}",
-                    f"{iteration}",
-                )
+                    table_result.add_row(
+                        f"{rms_value / voltage_amplitude:.8f}",
+                        f"{pid.controller_gain}",
+                        f"{pid.tauI}",
+                        f"{pid.tauD}",
+                        f"{iteration}",
+                    )
 
-                console.print(Panel(table_result))
+                    console.print(Panel(table_result))
 
-                if set_level_file_path is None:
-                    set_level_file_path = plot_file_path.with_suffix(".offset")
+                    if set_level_file_path is None:
+                        set_level_file_path = plot_file_path.with_suffix(".offset")
 
-                f = open(set_level_file_path, "w", encoding="utf-8")
-                f.write("{}\n".format(level_offset))
-                f.write("{}\n".format(gain_dB))
-                f.close()
+                    f = open(set_level_file_path, "w", encoding="utf-8")
+                    f.write("{}\n".format(level_offset))
+                    f.write("{}\n".format(gain_dB))
+                    f.close()
 
-                console.print(Panel("[PATH] - {}".format(set_level_file_path)))
+                    console.print(Panel("[PATH] - {}".format(set_level_file_path)))
 
-            else:
+                    if cache is not None and level_key is not None:
+                        if cached is not None and iteration == 0:
+                            console.print("[SAMPLING] - Cached level verified.")
 
-                pid.term.add_proportional(pid.proportional_term)
-                pid.term.add_integral(pid.integral_term)
-                pid.term.add_derivative(pid.derivative_term)
+                        cache.set(level_key, LevelEntry(level_offset, gain_dB))
 
-                output_variable: float = pid.output_process
+                else:
+                    output_variable: Optional[float] = None
 
-                pid.add_process_output(output_variable)
+                    if level_solver is not None:
+                        output_variable = level_solver.next_amplitude(
+                            voltage_amplitude, rms_value
+                        )
 
-                voltage_amplitude = output_variable
+                        if output_variable is None:
+                            console.print(
+                                "[SAMPLING] - Model failed, falling back to PID."
+                            )
+                            level_solver = None
+                            pid.restart(voltage_amplitude)
 
-                # Apply new Amplitude
-                generator_configs: list = [
-                    SCPI.set_source_voltage_amplitude(1, voltage_amplitude)
-                ]
+                    if output_variable is None:
+                        pid.term.add_proportional(pid.proportional_term)
+                        pid.term.add_integral(pid.integral_term)
+                        pid.term.add_derivative(pid.derivative_term)
 
-                SCPI.exec_commands(generator, generator_configs)
+                        output_variable = pid.output_process
 
-                sleep(0.4)
+                    pid.add_process_output(output_variable)
 
-                iteration += 1
-        else:
-            console.print("[SAMPLING] - Error retrieving rms_value.")
+                    voltage_amplitude = output_variable
+
+                    # Apply new Amplitude
+                    generator_configs: list = [
+                        SCPI.set_source_voltage_amplitude(1, voltage_amplitude)
+                    ]
+
+                    SCPI.exec_commands(generator, generator_configs)
+
+                    wait_settling(settling, daq_session, frequency, Fs)
+
+                    iteration += 1
+            else:
+                console.print("[SAMPLING] - Error retrieving rms_value.")
 
     generator_ac_curves: List[str] = [
         SCPI.set_output(1, Switch.OFF),
@@ -754,7 +1677,7 @@ def config_set_level(
 
     plt.subplot(2, 2, 3)
     plt.plot(
-        [error.value for error in pid.error_list],
+        pid.error_list,
         color="m",
         linestyle="--",
         linewidth=2,
@@ -775,3 +1698,121 @@ def config_set_level(
     plt.legend(loc="best")
 
     plt.savefig(plot_file_path)
+
+    return level_offset
+
+
+def config_level_table(
+    config: SweepConfigXML,
+    table_file_path: Path,
+    points_per_decade: float = 3,
+    debug: bool = False,
+) -> LevelTable:
+    """Walks a short logarithmic frequency plan once at the configured
+    amplitude and stores the measured level of every frequency in a
+    `LevelTable`, one acquisition per frequency.
+
+    `sampling_curve` interpolates the table to pre-compensate the generator
+    amplitude at every point of the sweep.
+    """
+    amplitude_peak_to_peak: float = config.rigol.amplitude_peak_to_peak
+
+    log_scale: LogarithmicScale = LogarithmicScale(
+        config.sampling.frequency_min,
+        config.sampling.frequency_max,
+        points_per_decade,
+    )
+
+    # The reference frequency is always measured
+    frequencies: List[float] = sorted(
+        set(log_scale.f_list) | {LevelTable.REFERENCE_FREQUENCY}
+    )
+
+    list_devices: List[Instrument] = UsbTmc.search_devices()
+    if debug:
+        UsbTmc.print_devices_list(list_devices)
+
+    generator: UsbTmc = UsbTmc(list_devices[0])
+    generator.open()
+
+    SCPI.exec_commands(
+        generator,
+        [
+            SCPI.clear(),
+            SCPI.set_output(1, Switch.OFF),
+            SCPI.set_function_voltage_ac(),
+            SCPI.set_voltage_ac_bandwidth(Bandwidth.MIN),
+            SCPI.set_source_voltage_amplitude(1, round(amplitude_peak_to_peak, 5)),
+            SCPI.set_source_frequency(1, round(frequencies[0], 5)),
+            SCPI.set_output(1, Switch.ON),
+        ],
+    )
+
+    settling = SettlingDetector(
+        tolerance=config.sampling.settle_tolerance,
+        timeout=config.sampling.settle_timeout,
+    )
+
+    table = Table(
+        Column("Frequency [Hz]", justify="right"),
+        Column("Vpp [V]", justify="right"),
+        Column("Rms Value [V]", justify="right"),
+        title="[blue]Level Table.",
+    )
+
+    frequency_list: List[float] = []
+    rms_list: List[float] = []
+
+    with AcquisitionSession(
+        ch_input=config.nidaq.input_channel,
+        min_voltage=config.nidaq.voltage_min,
+        max_voltage=config.nidaq.voltage_max,
+    ) as daq_session:
+        for frequency in frequencies:
+            Fs = trim_value(
+                frequency * config.sampling.Fs_multiplier, max_value=config.nidaq.Fs_max
+            )
+
+            generator.write(SCPI.set_source_frequency(1, round(frequency, 5)))
+            retune_time = perf_counter()
+
+            wait_settling(settling, daq_session, frequency, Fs, start_time=retune_time)
+
+            rms_value: Optional[float] = RMS.rms(
+                frequency=frequency,
+                Fs=Fs,
+                ch_input=config.nidaq.input_channel,
+                max_voltage=config.nidaq.voltage_max,
+                min_voltage=config.nidaq.voltage_min,
+                number_of_samples=config.sampling.number_of_samples,
+                time_report=False,
+                session=daq_session,
+            )
+
+            if rms_value:
+                frequency_list.append(frequency)
+                rms_list.append(rms_value)
+
+                table.add_row(
+                    "{:.2f}".format(frequency),
+                    "{}".format(amplitude_peak_to_peak),
+                    "{:.5f}".format(rms_value),
+                )
+            else:
+                console.print("[SAMPLING] - Error retrieving rms_value.", style="error")
+
+    SCPI.exec_commands(generator, [SCPI.set_output(1, Switch.OFF)])
+    generator.close()
+
+    console.print(table)
+
+    level_table = LevelTable(
+        frequency_list,
+        np.full(len(frequency_list), amplitude_peak_to_peak),
+        rms_list,
+    )
+    level_table.to_csv(table_file_path)
+
+    console.print(Panel("[PATH] - {}".format(table_file_path)))
+
+    return level_table
@@ -1,33 +1,66 @@
 import pathlib
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from fnmatch import fnmatch
 from typing import Dict, List, Optional, Tuple
 
 import click
+from click.core import ParameterSource
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
+from rich.live import Live
 from rich.panel import Panel
 from rich.prompt import Confirm
+from rich.table import Table
 
-from audio.config.sweep import SweepConfig
+import audio.ui.terminal as ui_t
+from audio.config.plot import PlotConfigXML
+from audio.config.sweep import SweepConfig, SweepConfigXML
 from audio.config.type import Range
 from audio.console import console
 from audio.docker.latex import create_latex_file
-from audio.math import find_sin_zero_offset, rms_full_cycle
+from audio.math import find_sin_zero_offset, rms_full_cycle, rms_prefixes
+from audio.math.decimation import min_max_decimate
 from audio.math.interpolation import INTERPOLATION_KIND, interpolation_model
-from audio.math.rms import RMS
+from audio.math.rms import RMS, RMS_MODE
+from audio.model.level import LevelCache, LevelTable
+from audio.model.archive import ARCHIVE_SUFFIX, SweepArchive
+from audio.model.catalog import Catalog, CatalogEntry, latest_sweep_dir
 from audio.model.sweep import SingleSweepData
-from audio.sampling import config_set_level, plot_from_csv, sampling_curve
+from audio.sampling import (
+    config_level_table,
+    config_set_level,
+    generator_identity,
+    plot_all,
+    plot_base_path,
+    plot_from_csv,
+    plot_process_init,
+    sampling_curve,
+    sampling_curve_ess,
+    sampling_curve_multitone,
+    set_level_key,
+)
 from audio.script.device.ni import read_rms
 from audio.script.device.rigol import set_amplitude, set_frequency, turn_off, turn_on
 from audio.script.procedure import procedure
 from audio.script.test import print_devices, testTimer
-from audio.utility import get_subfolder
 from audio.utility.timer import Timer
 
 
+# The options of the "step" sweep, refused by the other modes
+STEP_ONLY_OPTIONS: Dict[str, str] = {
+    "rms_mode": "--rms",
+    "coherent": "--coherent/--no-coherent",
+    "level_table_file": "--level_table",
+    "fsync_every": "--fsync-every",
+    "raw": "--raw/--no-raw",
+    "resume": "--resume",
+}
+
+
 @click.group()
 def cli():
     """This is the CLI for the audio measurements tools"""
@@ -56,6 +89,13 @@ def cli():
     help="Set Level file path.",
     default=None,
 )
+@click.option(
+    "--level_table",
+    "level_table_file",
+    type=pathlib.Path,
+    help="Level table file path, the amplitude of every point is pre-compensated.",
+    default=None,
+)
 # Config Overloads
 @click.option(
     "--amplitude_pp",
@@ -108,7 +148,69 @@ def cli():
     help="Offset value.",
     default=None,
 )
+@click.option(
+    "--mode",
+    type=click.Choice(["step", "ess", "multitone"], case_sensitive=False),
+    help='Sweep mode: "step" a sine per frequency, "ess" one Exponential Sine Sweep capture, "multitone" one capture per group of tones.',
+    default="step",
+    show_default=True,
+)
+@click.option(
+    "--ess-duration",
+    "ess_duration",
+    type=float,
+    help="Duration of the Exponential Sine Sweep [s].",
+    default=2.0,
+    show_default=True,
+)
+@click.option(
+    "--tones",
+    type=int,
+    help="Number of tones per multitone capture.",
+    default=16,
+    show_default=True,
+)
+@click.option(
+    "--rms",
+    "rms_mode",
+    type=click.Choice(["fft", "sine-fit", "goertzel"], case_sensitive=False),
+    help='RMS estimator of the "step" mode: "sine-fit" fits the sine at the known frequency with any number of periods, "goertzel" measures only the bin at the known frequency, Hann windowed without --coherent.',
+    default="fft",
+    show_default=True,
+)
+@click.option(
+    "--fsync-every",
+    "fsync_every",
+    type=int,
+    help="Syncs the sweep file to the disk every N points, 0 leaves it to the OS.",
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "--serial",
+    type=str,
+    help="Serial number of the DUT, recorded in the sweep catalog and part of the level cache key.",
+    default=None,
+)
 # Flags
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continues the most recent sweep in home, measuring only the missing frequencies.",
+    default=False,
+)
+@click.option(
+    "--raw/--no-raw",
+    "raw",
+    help="Reads the codes of the ADC, scaled to volts only when needed, only the archive stores the captures.",
+    default=False,
+)
+@click.option(
+    "--coherent/--no-coherent",
+    "coherent",
+    help="Plans every step point with an integer number of periods, skipping the interpolation and trim.",
+    default=True,
+)
 @click.option(
     "--time/--no-time",
     help="Show elapsed time.",
@@ -132,10 +234,17 @@ def cli():
     help="Will skip the pdf creation.",
     default=True,
 )
+@click.option(
+    "--preview",
+    is_flag=True,
+    help='Plots only a fast low resolution draft, "sweep.preview.png", without the pdf.',
+    default=False,
+)
 def sweep(
     config_path: pathlib.Path,
     home: pathlib.Path,
     set_level_file: Optional[pathlib.Path],
+    level_table_file: Optional[pathlib.Path],
     amplitude_pp: Optional[float],
     n_fs: Optional[float],
     spd: Optional[float],
@@ -144,12 +253,36 @@ def sweep(
     y_lim: Optional[Tuple[float, float]],
     x_lim: Optional[Tuple[float, float]],
     y_offset: Optional[float],
+    mode: str,
+    ess_duration: float,
+    tones: int,
+    rms_mode: str,
+    fsync_every: int,
+    serial: Optional[str],
+    resume: bool,
+    raw: bool,
+    coherent: bool,
     time: bool,
     debug: bool,
     simulate: bool,
     pdf: bool,
+    preview: bool,
 ):
 
+    if mode.lower() != "step":
+        context = click.get_current_context()
+
+        for name, option in STEP_ONLY_OPTIONS.items():
+            if context.get_parameter_source(name) != ParameterSource.DEFAULT:
+                raise click.UsageError(
+                    '{} is only supported by the "step" mode.'.format(option)
+                )
+
+    if resume and raw:
+        raise click.UsageError(
+            "A --raw sweep can't be resumed: its captures are archived only at the end."
+        )
+
     HOME_PATH = home.absolute().resolve()
 
     datetime_now = datetime.now().strftime(r"%Y-%m-%d--%H-%M-%f")
@@ -172,20 +305,21 @@ def sweep(
         f_max=f_range[1] if f_range else None,
     )
 
+    # The file names start with the datetime, sorted as strings
+    set_level_file_list = sorted(HOME_PATH.glob("*.config.offset"))
+
     if set_level_file:
-        amplitude_base_level = float(set_level_file.read_text())
+        amplitude_base_level = float(set_level_file.read_text().split("\n")[0])
+    elif len(set_level_file_list) > 0:
+        amplitude_base_level = float(set_level_file_list[-1].read_text().split("\n")[0])
     else:
-        set_level_file_list = [
-            set_level_file for set_level_file in HOME_PATH.glob("*.config.offset")
-        ]
-        if len(set_level_file_list) > 0:
-            pattern: str = r"%Y-%m-%d--%H-%M-%f"
-            set_level_file_list.sort(
-                key=lambda name: datetime.datetime.strptime(
-                    name.name.strip(".")[0], pattern
-                ),
-            )
-            amplitude_base_level = float(set_level_file_list[-1].read_text())
+        # Only a calibration of this generator, channel and DUT
+        cached_level = LevelCache().get(
+            set_level_key(generator_identity(), cfg.nidaq.input_channel, serial)
+        )
+
+        if cached_level is not None:
+            amplitude_base_level = cached_level.level_offset
         else:
             raise Exception
 
@@ -204,6 +338,16 @@ def sweep(
         console.print(cfg)
 
     measurements_dir: pathlib.Path = HOME_PATH / f"{datetime_now}"
+
+    if resume:
+        latest_dir: Optional[pathlib.Path] = latest_sweep_dir(HOME_PATH)
+
+        if latest_dir is not None:
+            measurements_dir = latest_dir
+            console.print(f'Resuming: "{measurements_dir}"')
+        else:
+            console.print("There is no sweep to resume.", style="error")
+
     measurements_dir.mkdir(parents=True, exist_ok=True)
 
     measurements_file: pathlib.Path = measurements_dir / "sweep.csv"
@@ -212,32 +356,82 @@ def sweep(
     if not simulate:
         timer = Timer("Sweep time")
 
+        # Catalogued from the start, so an interrupted sweep is found too.
+        # The row is updated with the points when the sweep ends.
+        Catalog(HOME_PATH).add(
+            CatalogEntry.from_sweep(
+                measurements_file, config=cfg, serial=serial, mode=mode
+            )
+        )
+
         if time:
             timer.start()
 
-        sampling_curve(
-            config=cfg,
-            measurements_file_path=measurements_file,
-            debug=debug,
-        )
+        if mode == "ess":
+            sampling_curve_ess(
+                config=cfg,
+                measurements_file_path=measurements_file,
+                duration=ess_duration,
+                debug=debug,
+            )
+        elif mode == "multitone":
+            sampling_curve_multitone(
+                config=cfg,
+                measurements_file_path=measurements_file,
+                tones_per_group=tones,
+                debug=debug,
+            )
+        else:
+            sampling_curve(
+                config=cfg,
+                measurements_file_path=measurements_file,
+                debug=debug,
+                coherent=coherent,
+                rms_mode=RMS_MODE[rms_mode.upper().replace("-", "_")],
+                level_table=(
+                    LevelTable.from_csv(level_table_file) if level_table_file else None
+                ),
+                resume=resume,
+                fsync_every=fsync_every,
+                raw=raw,
+            )
 
         if time:
             timer.stop().print()
 
-    if not simulate:
-
-        plot_from_csv(
-            measurements_file_path=measurements_file,
-            plot_file_path=image_file,
-            plot_config=cfg.plot,
-            debug=debug,
+        Catalog(HOME_PATH).add(
+            CatalogEntry.from_sweep(
+                measurements_file, config=cfg, serial=serial, mode=mode
+            )
         )
 
-        if pdf:
-            create_latex_file(
-                image_file, home=HOME_PATH, latex_home=measurements_dir, debug=debug
+    if not simulate:
+
+        if preview:
+            # The full resolution plot is left to the "plot" command
+            plot_from_csv(
+                measurements_file_path=measurements_file,
+                plot_file_path=measurements_dir / "sweep.preview.png",
+                plot_config=cfg.plot,
+                debug=debug,
+                preview=True,
+            )
+        else:
+            plot_from_csv(
+                measurements_file_path=measurements_file,
+                plot_file_path=image_file,
+                plot_config=cfg.plot,
+                debug=debug,
             )
 
+            if pdf:
+                create_latex_file(
+                    image_file,
+                    home=HOME_PATH,
+                    latex_home=measurements_dir,
+                    debug=debug,
+                )
+
 
 @cli.command(help="Plot from a csv file.")
 @click.option(
@@ -308,6 +502,18 @@ def sweep(
     help="Will skip the pdf creation.",
     default=True,
 )
+@click.option(
+    "--parallel/--no-parallel",
+    "parallel",
+    help="Saves the raster formats in other processes.",
+    default=False,
+)
+@click.option(
+    "--preview",
+    is_flag=True,
+    help="Plots a fast low resolution draft, --dpi is ignored.",
+    default=False,
+)
 @click.option(
     "--debug",
     is_flag=True,
@@ -325,6 +531,8 @@ def plot(
     interpolation_rate: Optional[float],
     dpi: Optional[int],
     pdf: bool,
+    parallel: bool,
+    preview: bool,
     debug: bool,
 ):
     HOME_PATH = home.absolute()
@@ -332,7 +540,7 @@ def plot(
     plot_file: Optional[pathlib.Path] = None
 
     sweep_config = SweepConfig.from_file(config_path)
-    plot_config: Plot = Plot()
+    plot_config: PlotConfigXML
 
     if sweep_config:
         plot_config = sweep_config.plot
@@ -345,7 +553,7 @@ def plot(
             dpi=dpi,
         )
     else:
-        plot_config = plot_config.from_value(
+        plot_config = PlotConfigXML.from_values(
             y_offset=y_offset,
             x_limit=Range(*x_lim) if x_lim else None,
             y_limit=Range(*y_lim) if y_lim else None,
@@ -378,10 +586,10 @@ def plot(
 
     if is_most_recent_file:
 
-        measurement_dirs: List[pathlib.Path] = get_subfolder(HOME_PATH)
+        latest_dir: Optional[pathlib.Path] = latest_sweep_dir(HOME_PATH)
 
-        if len(measurement_dirs) > 0:
-            csv_file = measurement_dirs[-1] / "sweep.csv"
+        if latest_dir is not None:
+            csv_file = latest_dir / "sweep.csv"
 
             if csv_file.exists() and csv_file.is_file():
                 plot_file = csv_file.with_suffix("")
@@ -390,22 +598,177 @@ def plot(
             console.print("There is no csv file available.", style="error")
 
     if plot_file:
-        for plot_file_format in format_plot:
-            plot_file = plot_file.with_suffix("." + plot_file_format)
-            console.print(f'Plotting file: "{plot_file.absolute()}"')
-            plot_from_csv(
-                measurements_file_path=csv_file,
-                plot_file_path=plot_file,
-                plot_config=plot_config,
-                debug=debug,
-            )
-            if plot_file_format == "png":
+        # "sweep.preview.<format>" for a draft, the full resolution plot is kept
+        plot_file = plot_base_path(csv_file, preview)
+
+        console.print(f'Plotting file: "{plot_file.absolute()}"')
+
+        # One render, saved in every format
+        plot_files = plot_from_csv(
+            measurements_file_path=csv_file,
+            plot_file_path=plot_file,
+            plot_config=plot_config,
+            debug=debug,
+            formats=list(format_plot),
+            parallel=parallel,
+            preview=preview,
+        )
+
+        for plot_file in plot_files:
+            if plot_file.suffix == ".png" and not preview:
                 if pdf:
                     create_latex_file(plot_file, home=HOME_PATH, latex_home=latex_home)
     else:
         console.print("Cannot create a plot file.", style="error")
 
 
+@cli.command(name="plot-all", help="Plots every sweep.csv under home, in parallel.")
+@click.option(
+    "--home",
+    type=pathlib.Path,
+    help="Home path, searched recursively for the sweep.csv files.",
+    default=pathlib.Path.cwd(),
+    show_default=True,
+)
+@click.option(
+    "--config",
+    "config_path",
+    type=pathlib.Path,
+    help="Configuration path of the config file in json5 format.",
+    default=None,
+)
+@click.option(
+    "--match",
+    type=str,
+    help='Plots only the sweep directories, relative to home, matching the pattern, e.g. "2023-05-*".',
+    default=None,
+)
+@click.option(
+    "--format-plot",
+    "format_plot",
+    type=click.Choice(["png", "pdf"], case_sensitive=False),
+    multiple=True,
+    help='Format of the plot, can be: "png" or "pdf".',
+    default=["png"],
+    show_default=True,
+)
+@click.option(
+    "--y_lim",
+    nargs=2,
+    type=(float, float),
+    help="Range y Plot.",
+    default=None,
+)
+@click.option(
+    "--x_lim",
+    nargs=2,
+    type=(float, float),
+    help="Range x Plot.",
+    default=None,
+)
+@click.option(
+    "--y_offset",
+    type=float,
+    help="Offset value.",
+    default=None,
+)
+@click.option(
+    "--interpolation_rate",
+    "interpolation_rate",
+    type=float,
+    help="Interpolation Rate.",
+    default=None,
+)
+@click.option(
+    "--dpi",
+    type=int,
+    help="Dpi Resolution for the image.",
+    default=None,
+)
+@click.option(
+    "--workers",
+    type=int,
+    help="Number of processes, by default the number of cores.",
+    default=None,
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Plots also the sweeps whose csv and config didn't change.",
+    default=False,
+)
+@click.option(
+    "--preview",
+    is_flag=True,
+    help="Plots a fast low resolution draft, --dpi is ignored.",
+    default=False,
+)
+def plot_all_command(
+    home: pathlib.Path,
+    config_path: Optional[pathlib.Path],
+    match: Optional[str],
+    format_plot: List[str],
+    y_lim: Optional[Tuple[float, float]],
+    x_lim: Optional[Tuple[float, float]],
+    y_offset: Optional[float],
+    interpolation_rate: Optional[float],
+    dpi: Optional[int],
+    workers: Optional[int],
+    force: bool,
+    preview: bool,
+):
+    HOME_PATH = home.absolute().resolve()
+
+    if config_path:
+        plot_config = SweepConfigXML.from_file(config_path).plot
+        plot_config.override(
+            y_offset=y_offset,
+            x_limit=Range(*x_lim) if x_lim else None,
+            y_limit=Range(*y_lim) if y_lim else None,
+            interpolation_rate=interpolation_rate,
+            dpi=dpi,
+        )
+    else:
+        plot_config = PlotConfigXML.from_values(
+            y_offset=y_offset,
+            x_limit=Range(*x_lim) if x_lim else None,
+            y_limit=Range(*y_lim) if y_lim else None,
+            interpolation_rate=interpolation_rate,
+            dpi=dpi,
+        )
+
+    measurements_files: List[pathlib.Path] = sorted(
+        file
+        for file in HOME_PATH.rglob("sweep.csv")
+        if match is None
+        or fnmatch(file.parent.relative_to(HOME_PATH).as_posix(), match)
+    )
+
+    if len(measurements_files) == 0:
+        console.print("There is no csv file available.", style="error")
+        return
+
+    plotted, skipped, failed = plot_all(
+        measurements_files,
+        plot_config,
+        formats=list(format_plot),
+        workers=workers,
+        force=force,
+        preview=preview,
+    )
+
+    for measurements_file, error in failed:
+        console.print(f'"{measurements_file}": {error}', style="error")
+
+    console.print(
+        Panel(
+            f"Plotted: [blue]{len(plotted)}[/] - "
+            + f"Unchanged: [blue]{len(skipped)}[/] - "
+            + f"Failed: [blue]{len(failed)}[/]"
+        )
+    )
+
+
 @cli.command(help="Gets the config Offset Through PID Controller.")
 @click.option(
     "--config",
@@ -421,6 +784,31 @@ def plot(
     default=pathlib.Path.cwd(),
     show_default=True,
 )
+@click.option(
+    "--model/--no-model",
+    "model",
+    help="Predicts the amplitude from the measured gain, the PID is used only if the prediction fails.",
+    default=True,
+)
+@click.option(
+    "--serial",
+    type=str,
+    help="Serial number of the DUT, part of the level cache key.",
+    default=None,
+)
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    help="Starts from a still valid cached level and verifies it with one measurement.",
+    default=True,
+)
+@click.option(
+    "--validity",
+    type=float,
+    help="Validity window of the cached levels [h].",
+    default=8.0,
+    show_default=True,
+)
 @click.option(
     "--debug",
     is_flag=True,
@@ -430,6 +818,10 @@ def plot(
 def set_level(
     config_path: pathlib.Path,
     home: pathlib.Path,
+    model: bool,
+    serial: Optional[str],
+    use_cache: bool,
+    validity: float,
     debug: bool,
 ):
     HOME_PATH = home.absolute().resolve()
@@ -445,240 +837,539 @@ def set_level(
     config_set_level(
         config=config.sampling,
         plot_file_path=HOME_PATH / "{}.config.png".format(datetime_now),
+        model=model,
+        cache=LevelCache(validity=timedelta(hours=validity)) if use_cache else None,
+        serial=serial,
         debug=debug,
     )
 
 
-@cli.command()
+@cli.command(help="Measures the level table for the sweep pre-compensation.")
+@click.option(
+    "--config",
+    "config_path",
+    type=pathlib.Path,
+    help="Configuration path of the config file in json5 format.",
+    required=True,
+)
 @click.option(
     "--home",
     type=pathlib.Path,
-    help="Home path, where the plot image will be created.",
+    help="Home path, where the level table will be created.",
     default=pathlib.Path.cwd(),
     show_default=True,
 )
 @click.option(
-    "--sweep-dir",
-    "sweep_dir",
-    type=pathlib.Path,
-    help="Home path, where the plot image will be created.",
-    default=None,
+    "--spd",
+    type=float,
+    help="Frequencies per decade of the table.",
+    default=3,
+    show_default=True,
 )
 @click.option(
-    "--iteration-rms/--no-iteration-rms",
-    "iteration_rms",
-    help="Home path, where the plot image will be created.",
+    "--debug",
+    is_flag=True,
+    help="Will print verbose messages.",
     default=False,
 )
-def sweep_debug(
-    home,
-    sweep_dir: Optional[pathlib.Path],
-    iteration_rms: bool,
+def level_table(
+    config_path: pathlib.Path,
+    home: pathlib.Path,
+    spd: float,
+    debug: bool,
 ):
-    measurement_dir: pathlib.Path = pathlib.Path()
+    HOME_PATH = home.absolute().resolve()
 
-    if sweep_dir:
-        measurement_dir = sweep_dir / "sweep"
+    datetime_now = datetime.now().strftime(r"%Y-%m-%d--%H-%M-%f")
 
-    else:
-        measurement_dirs: List[pathlib.Path] = get_subfolder(home)
+    config: SweepConfig = SweepConfig.from_file(config_path.absolute())
 
-        if len(measurement_dirs) > 0:
-            measurement_dir = measurement_dirs[-1] / "sweep"
-        else:
-            console.print(
-                "Cannot create the debug info from sweep csvs.", style="error"
-            )
-            exit()
+    if debug:
+        console.print(config)
 
-    if not measurement_dir.exists() or not measurement_dir.is_dir():
-        console.print("The measurement directory doesn't exists.")
-        exit()
+    config_level_table(
+        config=config,
+        table_file_path=HOME_PATH / "{}.level_table.csv".format(datetime_now),
+        points_per_decade=spd,
+        debug=debug,
+    )
 
-    csv_files = [csv for csv in measurement_dir.rglob("sample.csv") if csv.is_file()]
 
-    if len(csv_files) > 0:
-        csv_files.sort(key=lambda name: float(name.parent.name.replace("_", ".")))
+@cli.command(help="Converts a CSV sweep directory in a single binary archive.")
+@click.argument("sweep_dirs", nargs=-1, type=pathlib.Path)
+@click.option(
+    "--float32",
+    is_flag=True,
+    help="Stores the captures in single precision.",
+    default=False,
+)
+def archive(
+    sweep_dirs: Tuple[pathlib.Path, ...],
+    float32: bool,
+):
+    for sweep_dir in sweep_dirs:
+        measurements_file = sweep_dir / "sweep.csv"
 
-    for csv in csv_files:
-        csv_parent = csv.parent
-        plot_image = csv_parent / "plot.png"
+        if not measurements_file.exists():
+            console.print(f'"{measurements_file}" doesn\'t exists.', style="error")
+            continue
 
-        sweep_data = SingleSweepData(csv)
+        archive_file = SweepArchive.from_csv_tree(
+            measurements_file, dtype=np.float32 if float32 else np.float64
+        )
 
-        plot: Tuple[Figure, Dict[str, Axes]] = plt.subplot_mosaic(
+        console.print(f'Archive: "{archive_file}"')
+
+
+def plot_width(axes: Axes) -> int:
+    """The width of the axes in points, 1/72 inch: about the width of a
+    line, so finer details aren't visible whatever the dpi."""
+    return int(axes.get_window_extent().width * 72 / axes.figure.dpi)
+
+
+def sweep_debug_point(
+    data_file: pathlib.Path,
+    index: Optional[int],
+    point_dir: pathlib.Path,
+    iteration_rms: bool = False,
+    save_csv: bool = True,
+) -> float:
+    """Plots the diagnostic mosaic of a single capture of the sweep.
+
+    Args:
+        data_file (pathlib.Path): The "sample.csv" of the point, or the sweep
+            archive when `index` is the capture
+        index (Optional[int]): The capture in the archive
+        point_dir (pathlib.Path): Where "plot.png" and the csv files are saved
+        iteration_rms (bool, optional): Plots the RMS of the growing slices.
+        save_csv (bool, optional): Saves the interpolated samples and RMS.
+
+    Returns:
+        float: The frequency of the point
+    """
+    if index is None:
+        sweep_data = SingleSweepData(data_file)
+        voltages: np.ndarray = sweep_data.voltages.values
+        frequency: float = sweep_data.frequency
+        Fs: float = sweep_data.Fs
+    else:
+        with SweepArchive(data_file) as archive:
+            frequency = float(archive.capture_frequency[index])
+            Fs = float(archive.capture_Fs[index])
+            voltages = archive.capture(index)
+
+    plot_image = point_dir / "plot.png"
+
+    plot: Tuple[Figure, Dict[str, Axes]] = plt.subplot_mosaic(
+        [
+            ["samp", "samp", "rms_samp"],
+            ["intr_samp", "intr_samp", "rms_intr_samp"],
+            ["intr_samp_offset", "intr_samp_offset", "rms_intr_samp_offset"],
             [
-                ["samp", "samp", "rms_samp"],
-                ["intr_samp", "intr_samp", "rms_intr_samp"],
-                ["intr_samp_offset", "intr_samp_offset", "rms_intr_samp_offset"],
-                [
-                    "rms_intr_samp_offset_trim",
-                    "rms_intr_samp_offset_trim",
-                    "rms_intr_samp_offset_trim",
-                ],
+                "rms_intr_samp_offset_trim",
+                "rms_intr_samp_offset_trim",
+                "rms_intr_samp_offset_trim",
             ],
-            figsize=(30, 20),
-            dpi=300,
-        )
-        # plt.tight_layout()
+        ],
+        figsize=(30, 20),
+        dpi=300,
+    )
+    # plt.tight_layout()
 
-        fig, axd = plot
+    fig, axd = plot
 
-        for ax_key in axd:
-            axd[ax_key].grid(True)
+    for ax_key in axd:
+        axd[ax_key].grid(True)
 
-        fig.suptitle(f"Frequency: {sweep_data.frequency} Hz.", fontsize=30)
-        fig.subplots_adjust(
-            wspace=0.5,  # the amount of width reserved for blank space between subplots
-            hspace=0.5,  # the amount of height reserved for white space between subplots
-        )
+    fig.suptitle(f"Frequency: {frequency} Hz.", fontsize=30)
+    fig.subplots_adjust(
+        wspace=0.5,  # the amount of width reserved for blank space between subplots
+        hspace=0.5,  # the amount of height reserved for white space between subplots
+    )
 
-        # PLOT: Samples on Time Domain
-        ax_time_domain_samples = axd["samp"]
+    # PLOT: Samples on Time Domain
+    ax_time_domain_samples = axd["samp"]
 
-        rms_samp = RMS.fft(sweep_data.voltages.values)
+    rms_samp = RMS.fft(voltages)
 
-        ax_time_domain_samples.plot(
+    # Every curve is decimated to the width of its plot, keeping the peaks:
+    # the render time doesn't grow with the length of the capture
+    ax_time_domain_samples.plot(
+        *min_max_decimate(
             np.linspace(
                 0,
-                len(sweep_data.voltages) / sweep_data.Fs,
-                len(sweep_data.voltages),
+                len(voltages) / Fs,
+                len(voltages),
             ),
-            sweep_data.voltages,
-            marker=".",
-            markersize=3,
-            linestyle="-",
-            linewidth=1,
-            label=f"Voltage Sample - rms={rms_samp:.5}",
-        )
-        ax_time_domain_samples.set_title(
-            f"Samples on Time Domain - Frequency: {round(sweep_data.frequency, 5)}"
+            voltages,
+            plot_width(ax_time_domain_samples),
+        ),
+        marker=".",
+        markersize=3,
+        linestyle="-",
+        linewidth=1,
+        label=f"Voltage Sample - rms={rms_samp:.5}",
+    )
+    ax_time_domain_samples.set_title(
+        f"Samples on Time Domain - Frequency: {round(frequency, 5)}"
+    )
+    ax_time_domain_samples.set_ylabel("Voltage [$V$]")
+    ax_time_domain_samples.set_xlabel("Time [$s$]")
+    # ax_time_domain_samples.legend(bbox_to_anchor=(1, 0.5), loc="center left")
+    ax_time_domain_samples.legend(loc="best")
+
+    # PLOT: RMS iterating every 5 values
+    if iteration_rms:
+        plot_rms_samp = axd["rms_samp"]
+        rms_samp_iter_list: List[float] = [0] + list(
+            rms_prefixes(voltages, range(5, len(voltages), 5))
         )
-        ax_time_domain_samples.set_ylabel("Voltage [$V$]")
-        ax_time_domain_samples.set_xlabel("Time [$s$]")
-        # ax_time_domain_samples.legend(bbox_to_anchor=(1, 0.5), loc="center left")
-        ax_time_domain_samples.legend(loc="best")
-
-        # PLOT: RMS iterating every 5 values
-        if iteration_rms:
-            plot_rms_samp = axd["rms_samp"]
-            rms_samp_iter_list: List[float] = [0]
-            for n in range(5, len(sweep_data.voltages.values), 5):
-                rms_samp_iter_list.append(RMS.fft(sweep_data.voltages.values[0:n]))
-
-            plot_rms_samp.plot(
+
+        plot_rms_samp.plot(
+            *min_max_decimate(
                 np.arange(
                     0,
-                    len(sweep_data.voltages),
+                    len(voltages),
                     5,
                 ),
                 rms_samp_iter_list,
-                label="Iterations Sample RMS",
-            )
-            plot_rms_samp.legend(loc="best")
-
-        plot_intr_samp = axd["intr_samp"]
-        voltages_to_interpolate = sweep_data.voltages.values
-        INTERPOLATION_RATE = 10
-        x_interpolated, y_interpolated = interpolation_model(
-            range(0, len(voltages_to_interpolate)),
-            voltages_to_interpolate,
-            int(len(voltages_to_interpolate) * INTERPOLATION_RATE),
-            kind=INTERPOLATION_KIND.CUBIC,
+                plot_width(plot_rms_samp),
+            ),
+            label="Iterations Sample RMS",
         )
+        plot_rms_samp.legend(loc="best")
+
+    plot_intr_samp = axd["intr_samp"]
+    voltages_to_interpolate = voltages
+    INTERPOLATION_RATE = 10
+    x_interpolated, y_interpolated = interpolation_model(
+        range(0, len(voltages_to_interpolate)),
+        voltages_to_interpolate,
+        int(len(voltages_to_interpolate) * INTERPOLATION_RATE),
+        kind=INTERPOLATION_KIND.CUBIC,
+    )
 
+    if save_csv:
         pd.DataFrame(y_interpolated).to_csv(
-            pathlib.Path(csv_parent / "interpolation_sample.csv").absolute().resolve(),
+            pathlib.Path(point_dir / "interpolation_sample.csv").absolute().resolve(),
             header=["voltage"],
             index=None,
         )
 
-        rms_intr = RMS.fft(y_interpolated)
-        plot_intr_samp.plot(
+    rms_intr = RMS.fft(y_interpolated)
+    plot_intr_samp.plot(
+        *min_max_decimate(
             np.linspace(
                 0,
-                len(y_interpolated) / (sweep_data.Fs * INTERPOLATION_RATE),
+                len(y_interpolated) / (Fs * INTERPOLATION_RATE),
                 len(y_interpolated),
             ),
             # x_interpolated,
             y_interpolated,
-            linestyle="-",
-            linewidth=0.5,
-            label=f"rms={rms_intr:.5}",
+            plot_width(plot_intr_samp),
+        ),
+        linestyle="-",
+        linewidth=0.5,
+        label=f"rms={rms_intr:.5}",
+    )
+    plot_intr_samp.set_title("Interpolated Samples")
+    plot_intr_samp.set_ylabel("Voltage [$V$]")
+    plot_intr_samp.set_xlabel("Time [$s$]")
+    plot_intr_samp.legend(loc="best")
+
+    if iteration_rms:
+        plot_rms_intr_samp = axd["rms_intr_samp"]
+        rms_intr_samp_iter_list: List[float] = [0] + list(
+            rms_prefixes(y_interpolated, range(1, len(y_interpolated), 20))
         )
-        plot_intr_samp.set_title("Interpolated Samples")
-        plot_intr_samp.set_ylabel("Voltage [$V$]")
-        plot_intr_samp.set_xlabel("Time [$s$]")
-        plot_intr_samp.legend(loc="best")
-
-        if iteration_rms:
-            plot_rms_intr_samp = axd["rms_intr_samp"]
-            rms_intr_samp_iter_list: List[float] = [0]
-            for n in range(1, len(y_interpolated), 20):
-                rms_intr_samp_iter_list.append(RMS.fft(y_interpolated[0:n]))
-
-            plot_rms_intr_samp.plot(
+
+        plot_rms_intr_samp.plot(
+            *min_max_decimate(
+                np.arange(len(rms_intr_samp_iter_list)),
                 rms_intr_samp_iter_list,
-                label="Iterations Interpolated Sample RMS",
-            )
-            plot_rms_intr_samp.legend(loc="best")
+                plot_width(plot_rms_intr_samp),
+            ),
+            label="Iterations Interpolated Sample RMS",
+        )
+        plot_rms_intr_samp.legend(loc="best")
 
-        # PLOT: Interpolated Sample, Zero Offset for complete Cycles
-        offset_interpolated, idx_start, idx_end = find_sin_zero_offset(y_interpolated)
+    # PLOT: Interpolated Sample, Zero Offset for complete Cycles
+    offset_interpolated, idx_start, idx_end = find_sin_zero_offset(y_interpolated)
 
-        plot_intr_samp_offset = axd["intr_samp_offset"]
-        rms_intr_offset = RMS.fft(offset_interpolated)
-        plot_intr_samp_offset.plot(
+    plot_intr_samp_offset = axd["intr_samp_offset"]
+    rms_intr_offset = RMS.fft(offset_interpolated)
+    plot_intr_samp_offset.plot(
+        *min_max_decimate(
             np.linspace(
-                idx_start / sweep_data.Fs,
-                len(offset_interpolated) / (sweep_data.Fs * INTERPOLATION_RATE),
+                idx_start / Fs,
+                len(offset_interpolated) / (Fs * INTERPOLATION_RATE),
                 len(offset_interpolated),
             ),
             offset_interpolated,
-            linewidth=0.7,
-            label=f"rms={rms_intr_offset:.5}",
+            plot_width(plot_intr_samp_offset),
+        ),
+        linewidth=0.7,
+        label=f"rms={rms_intr_offset:.5}",
+    )
+    plot_intr_samp_offset.set_title("Interpolated Samples with Offset")
+    plot_intr_samp_offset.set_ylabel("Voltage [$V$]")
+    plot_intr_samp_offset.set_xlabel("Time [$s$]")
+    plot_intr_samp_offset.legend(loc="best")
+
+    if iteration_rms:
+        plot_rms_intr_samp_offset = axd["rms_intr_samp_offset"]
+        rms_intr_samp_offset_iter_list: List[float] = [0] + list(
+            rms_prefixes(offset_interpolated, range(1, len(offset_interpolated), 20))
         )
-        plot_intr_samp_offset.set_title("Interpolated Samples with Offset")
-        plot_intr_samp_offset.set_ylabel("Voltage [$V$]")
-        plot_intr_samp_offset.set_xlabel("Time [$s$]")
-        plot_intr_samp_offset.legend(loc="best")
-
-        if iteration_rms:
-            plot_rms_intr_samp_offset = axd["rms_intr_samp_offset"]
-            rms_intr_samp_offset_iter_list: List[float] = [0]
-
-            for n in range(1, len(offset_interpolated), 20):
-                rms_intr_samp_offset_iter_list.append(RMS.fft(offset_interpolated[0:n]))
 
+        if save_csv:
             pd.DataFrame(rms_intr_samp_offset_iter_list).to_csv(
-                pathlib.Path(csv_parent / "interpolation_rms.csv").absolute().resolve(),
+                pathlib.Path(point_dir / "interpolation_rms.csv").absolute().resolve(),
                 header=["voltage"],
                 index=None,
             )
 
-            plot_rms_intr_samp_offset.plot(
+        plot_rms_intr_samp_offset.plot(
+            *min_max_decimate(
+                np.arange(len(rms_intr_samp_offset_iter_list)),
                 rms_intr_samp_offset_iter_list,
-                label="Iterations Interpolated Sample with Offset RMS",
+                plot_width(plot_rms_intr_samp_offset),
+            ),
+            label="Iterations Interpolated Sample with Offset RMS",
+        )
+        plot_rms_intr_samp_offset.legend(loc="best")
+
+    # PLOT: RMS every sine period
+    plot_rms_intr_samp_offset_trim = axd["rms_intr_samp_offset_trim"]
+    (plot_rms_fft_intr_samp_offset_trim_list) = rms_full_cycle(offset_interpolated)
+
+    plot_rms_intr_samp_offset_trim.plot(
+        plot_rms_fft_intr_samp_offset_trim_list,
+        label="RMS fft per period, Interpolated",
+    )
+    plot_rms_intr_samp_offset_trim.legend(loc="best")
+
+    # Not pyplot's savefig, it draws the figure again after saving it
+    fig.savefig(plot_image)
+    plt.close(fig)
+
+    return frequency
+
+
+@cli.command()
+@click.option(
+    "--home",
+    type=pathlib.Path,
+    help="Home path, where the plot image will be created.",
+    default=pathlib.Path.cwd(),
+    show_default=True,
+)
+@click.option(
+    "--sweep-dir",
+    "sweep_dir",
+    type=pathlib.Path,
+    help="Home path, where the plot image will be created.",
+    default=None,
+)
+@click.option(
+    "--iteration-rms/--no-iteration-rms",
+    "iteration_rms",
+    help="Home path, where the plot image will be created.",
+    default=False,
+)
+@click.option(
+    "--csv/--no-csv",
+    "save_csv",
+    help="Saves the interpolated samples and RMS of every point as csv.",
+    default=True,
+)
+@click.option(
+    "--workers",
+    type=int,
+    help="Number of processes, by default the number of cores.",
+    default=None,
+)
+def sweep_debug(
+    home,
+    sweep_dir: Optional[pathlib.Path],
+    iteration_rms: bool,
+    save_csv: bool,
+    workers: Optional[int],
+):
+    measurement_dir: pathlib.Path = pathlib.Path()
+
+    if sweep_dir:
+        measurement_dir = sweep_dir / "sweep"
+
+    else:
+        latest_dir: Optional[pathlib.Path] = latest_sweep_dir(home)
+
+        if latest_dir is not None:
+            measurement_dir = latest_dir / "sweep"
+        else:
+            console.print(
+                "Cannot create the debug info from sweep csvs.", style="error"
+            )
+            exit()
+
+    if not measurement_dir.exists() or not measurement_dir.is_dir():
+        console.print("The measurement directory doesn't exists.")
+        exit()
+
+    # Only the file and the index are sent, every process loads its capture
+    tasks: List[Tuple[pathlib.Path, Optional[int], pathlib.Path]] = []
+
+    archive_file = (measurement_dir.parent / "sweep").with_suffix(ARCHIVE_SUFFIX)
+
+    if archive_file.exists():
+        with SweepArchive(archive_file) as archive:
+            capture_frequency = archive.capture_frequency
+
+        for index, frequency in enumerate(capture_frequency):
+            point_dir = measurement_dir / "{}".format(round(frequency, 5)).replace(
+                ".", "_", 1
             )
-            plot_rms_intr_samp_offset.legend(loc="best")
+            point_dir.mkdir(parents=True, exist_ok=True)
+
+            tasks.append((archive_file, index, point_dir))
+    else:
+        csv_files = [
+            csv for csv in measurement_dir.rglob("sample.csv") if csv.is_file()
+        ]
+
+        if len(csv_files) > 0:
+            csv_files.sort(key=lambda name: float(name.parent.name.replace("_", ".")))
+
+        tasks = [(csv, None, csv.parent) for csv in csv_files]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=plot_process_init
+    ) as executor:
+        futures = {
+            executor.submit(
+                sweep_debug_point, data_file, index, point_dir, iteration_rms, save_csv
+            ): (data_file, index, point_dir)
+            for data_file, index, point_dir in tasks
+        }
+
+        task = ui_t.progress_files.add_task("Debug", total=len(futures), file="")
+
+        with Live(Panel(ui_t.progress_files), transient=True, console=console):
+            for future in as_completed(futures):
+                data_file, index, point_dir = futures[future]
+
+                try:
+                    frequency = future.result()
+                except (Exception, SystemExit) as e:
+                    # SingleSweepData exits on an unreadable header
+                    console.print(
+                        '[ERROR] - Point "{}" from "{}"{}: {}'.format(
+                            point_dir.name,
+                            data_file,
+                            f" (capture {index})" if index is not None else "",
+                            "unreadable file" if isinstance(e, SystemExit) else e,
+                        ),
+                        style="error",
+                    )
+                    ui_t.progress_files.advance(task)
+                    continue
+
+                ui_t.progress_files.update(task, advance=1, file=f"{frequency:7.5} Hz")
+                console.print(f"Plotted Frequency: [blue]{frequency:7.5}[/].")
+
+        ui_t.progress_files.remove_task(task)
 
-        # PLOT: RMS every sine period
-        plot_rms_intr_samp_offset_trim = axd["rms_intr_samp_offset_trim"]
-        (plot_rms_fft_intr_samp_offset_trim_list) = rms_full_cycle(offset_interpolated)
 
-        plot_rms_intr_samp_offset_trim.plot(
-            plot_rms_fft_intr_samp_offset_trim_list,
-            label="RMS fft per period, Interpolated",
+cli.add_command(procedure)
+
+
+def print_catalog_entries(entries: List[CatalogEntry]):
+    if len(entries) == 0:
+        console.print("There is no sweep in the catalog.", style="error")
+        return
+
+    table = Table("Timestamp", "Serial", "Mode", "Points", "Config", "Sweep file")
+
+    for entry in entries:
+        table.add_row(
+            entry.timestamp.isoformat(sep=" ", timespec="seconds"),
+            entry.serial if entry.serial else "",
+            entry.mode,
+            str(entry.points),
+            entry.config_hash[:12] if entry.config_hash else "",
+            str(entry.measurements_file),
         )
-        plot_rms_intr_samp_offset_trim.legend(loc="best")
 
-        plt.savefig(plot_image)
-        plt.close("all")
+    console.print(table)
+
 
-        console.print(f"Plotted Frequency: [blue]{sweep_data.frequency:7.5}[/].")
+@cli.group(help="Queries the catalog of the sweeps of a home directory.")
+def catalog():
+    pass
 
 
-cli.add_command(procedure)
+catalog_home_option = click.option(
+    "--home",
+    type=pathlib.Path,
+    help="Home path, where the sweeps and the catalog are.",
+    default=pathlib.Path.cwd(),
+    show_default=True,
+)
+
+
+@catalog.command(help="The most recent sweep.")
+@catalog_home_option
+@click.option(
+    "--serial",
+    type=str,
+    help="Serial number of the DUT.",
+    default=None,
+)
+def latest(home: pathlib.Path, serial: Optional[str]):
+    entry = Catalog(home.absolute().resolve()).latest(serial)
+
+    print_catalog_entries([entry] if entry else [])
+
+
+@catalog.command(name="serial", help="The sweeps of a DUT.")
+@catalog_home_option
+@click.argument("serial", type=str)
+def catalog_serial(home: pathlib.Path, serial: str):
+    print_catalog_entries(Catalog(home.absolute().resolve()).by_serial(serial))
+
+
+@catalog.command(name="range", help="The sweeps between two dates.")
+@catalog_home_option
+@click.option(
+    "--from",
+    "start",
+    type=click.DateTime(),
+    help="First date.",
+    default=None,
+)
+@click.option(
+    "--to",
+    "end",
+    type=click.DateTime(),
+    help="Last date.",
+    default=None,
+)
+def catalog_range(
+    home: pathlib.Path,
+    start: Optional[datetime],
+    end: Optional[datetime],
+):
+    print_catalog_entries(Catalog(home.absolute().resolve()).between(start, end))
+
+
+@catalog.command(help="Adds the sweeps made before the catalog existed.")
+@catalog_home_option
+def rebuild(home: pathlib.Path):
+    HOME_PATH = home.absolute().resolve()
+
+    count = Catalog(HOME_PATH).rebuild(HOME_PATH)
+
+    console.print(f"Sweeps in the catalog: [blue]{count}[/].")
 
 
 @cli.group()
@@ -9,6 +9,8 @@ from audio.config.rigol import RigolConfig, RigolConfigEnum
 from audio.config.sweep import SweepConfig, SweepConfig, SweepConfigEnum, SweepConfigXML
 from audio.config.type import Range
 from audio.console import console
+from audio.model.catalog import Catalog, CatalogEntry
+from audio.model.level import LevelCache
 from audio.procedure import (
     Procedure,
     ProcedureInsertionGain,
@@ -55,6 +57,10 @@ def procedure(
     root: pathlib.Path = HOME_PATH
     data: Dict = dict()
 
+    level_cache = LevelCache()
+    catalog = Catalog(HOME_PATH)
+    serial_number: Optional[str] = None
+
     console.print(procedure.steps)
 
     for idx, step in enumerate(procedure.steps):
@@ -81,6 +87,8 @@ def procedure(
                 config=sampling_config,
                 plot_file_path=plot_file,
                 set_level_file_path=set_level_file,
+                cache=level_cache,
+                serial=serial_number,
                 debug=True,
             )
             data[step.name] = set_level_file
@@ -177,16 +185,29 @@ def procedure(
 
             Confirm.ask()
 
+            # Updated with the points when the sweep ends
+            catalog.add(
+                CatalogEntry.from_sweep(
+                    measurement_file, config=sweep_config, serial=serial_number
+                )
+            )
+
             sampling_curve(
                 config=sweep_config,
                 measurements_file_path=measurement_file,
                 debug=True,
             )
 
+            catalog.add(
+                CatalogEntry.from_sweep(
+                    measurement_file, config=sweep_config, serial=serial_number
+                )
+            )
+
             plot_from_csv(
                 measurements_file_path=measurement_file,
                 plot_file_path=plot_file,
-                sweep_config=sweep_config,
+                plot_config=sweep_config.plot,
                 debug=True,
             )
 
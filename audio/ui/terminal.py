@@ -29,6 +29,24 @@ progress_sweep = Progress(
     transient=True,
 )
 
+progress_files = Progress(
+    SpinnerColumn(),
+    "•",
+    TextColumn(
+        "[bold blue]{task.description}",
+        justify="right",
+    ),
+    BarColumn(),
+    TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+    "•",
+    TimeElapsedColumn(),
+    "•",
+    MofNCompleteColumn(),
+    TextColumn(" - [bold green]{task.fields[file]}"),
+    console=console,
+    transient=True,
+)
+
 progress_task = Progress(
     SpinnerColumn(),
     "•",
@@ -55,6 +55,10 @@ class UsbTmc:
         """Execute a command."""
         self.instr.instrument.write(command)
 
+    def write_raw(self, data: bytes):
+        """Execute a command with a binary block."""
+        self.instr.instrument.write_raw(data)
+
     def ask(self, command):
         """Asks to retrive a value."""
         return self.instr.instrument.ask(command)
@@ -1,6 +1,6 @@
 import datetime
 import pathlib
-from typing import List
+from typing import List, Optional, Union
 
 import nidaqmx
 import nidaqmx.constants
@@ -10,6 +10,7 @@ import nidaqmx.system
 import numpy as np
 
 from audio.console import console
+from audio.model.capture import RawCapture
 
 
 def trim_value(value: float, max_value: float):
@@ -35,6 +36,199 @@ def get_subfolder(
     return measurement_dirs
 
 
+class AcquisitionSession:
+    """Keeps a single NI-DAQmx Task open for a whole measurement.
+
+    The Task, the AI Voltage Channel and the stream reader are created once
+    in `open()`, every acquisition only reconfigures the sample clock and the
+    buffer size when they differ from the previous one.
+
+    With `raw` the stream reader is the unscaled one: every acquisition reads
+    the codes of the ADC, the raw sample size and the scaling coefficients
+    of the device are read once in `open()`. The 16 bit samples are read as
+    int16, the 32 bit ones (e.g. a 24 bit ADC) as int32.
+    """
+
+    ch_input: str
+    min_voltage: float
+    max_voltage: float
+    raw: bool
+
+    task: Optional[nidaqmx.Task] = None
+    scaling_coefficients: Optional[np.ndarray] = None
+    raw_sample_size: Optional[int] = None
+
+    _reader: Optional[
+        Union[
+            nidaqmx.stream_readers.AnalogSingleChannelReader,
+            nidaqmx.stream_readers.AnalogUnscaledReader,
+        ]
+    ] = None
+    _Fs: Optional[float] = None
+    _number_of_samples: Optional[int] = None
+
+    def __init__(
+        self,
+        ch_input: str,
+        min_voltage: float,
+        max_voltage: float,
+        raw: bool = False,
+    ) -> None:
+        self.ch_input = ch_input
+        self.min_voltage = min_voltage
+        self.max_voltage = max_voltage
+        self.raw = raw
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def is_open(self) -> bool:
+        return self.task is not None
+
+    def open(self):
+        if self.is_open:
+            return
+
+        self.task = nidaqmx.Task("Input Voltage")
+
+        try:
+            channel = self.task.ai_channels.add_ai_voltage_chan(
+                self.ch_input, min_val=self.min_voltage, max_val=self.max_voltage
+            )
+
+            if self.raw:
+                self.raw_sample_size = int(channel.ai_raw_samp_size)
+
+                if self.raw_sample_size not in (16, 32):
+                    raise ValueError(
+                        "Raw samples of {} bits are not supported.".format(
+                            self.raw_sample_size
+                        )
+                    )
+
+                self.scaling_coefficients = np.asarray(
+                    channel.ai_dev_scaling_coeff, dtype=np.float64
+                )
+                self._reader = nidaqmx.stream_readers.AnalogUnscaledReader(
+                    self.task.in_stream
+                )
+            else:
+                self._reader = nidaqmx.stream_readers.AnalogSingleChannelReader(
+                    self.task.in_stream
+                )
+        except Exception as e:
+            self.close()
+            raise e
+
+    def close(self):
+        if self.task is not None:
+            self.task.close()
+
+        self.task = None
+        self.scaling_coefficients = None
+        self.raw_sample_size = None
+        self._reader = None
+        self._Fs = None
+        self._number_of_samples = None
+
+    @property
+    def sample_rate(self) -> Optional[float]:
+        """The sampling rate actually used by the device, it can be coerced
+        to a near value by the device."""
+        if not self.is_open or self._Fs is None:
+            return None
+
+        return self.task.timing.samp_clk_rate
+
+    def configure(self, Fs: float, number_of_samples: int):
+        """Sets the Clock sampling rate and the buffer size, only if changed.
+
+        Args:
+            Fs (float): Sampling rate
+            number_of_samples (int): Number of samples per acquisition
+        """
+        if not self.is_open:
+            self.open()
+
+        if Fs == self._Fs and number_of_samples == self._number_of_samples:
+            return
+
+        self.task.timing.cfg_samp_clk_timing(
+            Fs,
+            sample_mode=nidaqmx.constants.AcquisitionType.FINITE,
+            samps_per_chan=number_of_samples,
+        )
+
+        self._Fs = Fs
+        self._number_of_samples = number_of_samples
+
+    def read_voltages(
+        self,
+        frequency: float,
+        Fs: float,
+        number_of_samples: int,
+    ) -> np.ndarray:
+
+        if self.raw:
+            return self.read_capture(frequency, Fs, number_of_samples).voltages
+
+        if frequency > Fs / 2:
+            raise ValueError("The Sampling rate is low: Fs / 2 > frequency.")
+
+        self.configure(Fs, number_of_samples)
+
+        voltages = np.ndarray(number_of_samples, dtype=float)
+
+        self.task.start()
+
+        try:
+            self._reader.read_many_sample(
+                voltages, number_of_samples_per_channel=number_of_samples
+            )
+        finally:
+            self.task.stop()
+
+        return voltages
+
+    def read_capture(
+        self,
+        frequency: float,
+        Fs: float,
+        number_of_samples: int,
+    ) -> RawCapture:
+        """Reads the codes of the ADC, only for a `raw` session."""
+        if not self.raw:
+            raise ValueError("The session doesn't read the unscaled codes.")
+
+        if frequency > Fs / 2:
+            raise ValueError("The Sampling rate is low: Fs / 2 > frequency.")
+
+        self.configure(Fs, number_of_samples)
+
+        # The unscaled reader fills a channels x samples array, of the
+        # integer type of the raw samples
+        if self.raw_sample_size == 32:
+            codes = np.ndarray((1, number_of_samples), dtype=np.int32)
+            read = self._reader.read_int32
+        else:
+            codes = np.ndarray((1, number_of_samples), dtype=np.int16)
+            read = self._reader.read_int16
+
+        self.task.start()
+
+        try:
+            read(codes, number_of_samples_per_channel=number_of_samples)
+        finally:
+            self.task.stop()
+
+        return RawCapture(codes[0], self.scaling_coefficients)
+
+
 def read_voltages(
     frequency: float,
     Fs: float,
@@ -42,11 +236,16 @@ def read_voltages(
     ch_input: str,
     min_voltage: float,
     max_voltage: float,
+    session: Optional[AcquisitionSession] = None,
 ) -> np.ndarray:
 
     if frequency > Fs / 2:
         raise ValueError("The Sampling rate is low: Fs / 2 > frequency.")
 
+    # Reuse the already opened Task
+    if session is not None:
+        return session.read_voltages(frequency, Fs, number_of_samples)
+
     try:
         # 1. Create a NidaqMX Task
         task = nidaqmx.Task("Input Voltage")
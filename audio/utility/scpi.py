@@ -1,6 +1,8 @@
 from enum import Enum
 from typing import List, Union
 
+import numpy as np
+
 from audio.console import console
 from audio.usb.usbtmc import UsbTmc
 
@@ -16,6 +18,11 @@ class Bandwidth(Enum):
     DEF = "DEF"
 
 
+class DataFlag(Enum):
+    CON = "CON"
+    END = "END"
+
+
 class SCPI:
     @staticmethod
     def exec_commands(instr: UsbTmc, commands: List[str], debug: bool = False):
@@ -33,6 +40,56 @@ class SCPI:
                 if debug:
                     console.print(command)
 
+    @staticmethod
+    def exec_arbitrary_waveform(
+        instr: UsbTmc,
+        source: int,
+        waveform: np.ndarray,
+        packet_size: int = 16384,
+    ):
+        """Downloads the waveform to the volatile memory of the source,
+        splitted in packets of max 16 kpts.
+        When the last packet is received the instrument switches to the
+        arbitrary waveform output.
+
+        Args:
+            instr (UsbTmc): The generator
+            source (int): The source
+            waveform (np.ndarray): The waveform normalized between -1 and 1
+        """
+        dac16 = SCPI.waveform_to_dac16(waveform)
+
+        for start in range(0, len(dac16), packet_size):
+            packet = dac16[start : start + packet_size]
+
+            flag = DataFlag.END if start + packet_size >= len(dac16) else DataFlag.CON
+
+            instr.write_raw(SCPI.set_source_trace_data_dac16(source, flag, packet))
+
+    @staticmethod
+    def waveform_to_dac16(waveform: np.ndarray) -> np.ndarray:
+        """Maps the waveform from [-1, 1] to the DAC codes [0x0000, 0x3FFF]."""
+        waveform = np.clip(np.asarray(waveform, dtype=float), -1, 1)
+
+        return np.round((waveform + 1) / 2 * 0x3FFF).astype("<u2")
+
+    @staticmethod
+    def set_source_trace_data_dac16(
+        source: int, flag: DataFlag, data: np.ndarray
+    ) -> bytes:
+        if SCPI.check_source(source):
+            console.print("Setting Source to 0", style="warning")
+            source = 0
+
+        payload: bytes = np.asarray(data, dtype="<u2").tobytes()
+        length: str = str(len(payload))
+
+        command = ":SOURce{0}:TRACe:DATA:DAC16 VOLATILE,{1},#{2}{3}".format(
+            source, flag.value, len(length), length
+        )
+
+        return command.encode("ascii") + payload
+
     @staticmethod
     def clear() -> str:
         return "*CLS"
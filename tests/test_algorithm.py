@@ -1,7 +1,7 @@
 import numpy as np
-import pytest
 
-from audio.math.algorithm import LogarithmicScale
+from audio.math.algorithm import CoherentPlanner, LogarithmicScale
+from audio.math.rms import RMS
 from audio.console import console
 from rich import inspect
 
@@ -22,3 +22,40 @@ def test_algorithm():
         np.float_power(10, 1), np.float_power(10, 3.04), 20
     )
     console.print(inspect(log_scale))
+
+
+def test_coherent_planner():
+    planner = CoherentPlanner(Fs_multiplier=100, Fs_max=102000)
+
+    log_scale: LogarithmicScale = LogarithmicScale(20, 20000, 50)
+
+    for point in planner.plan_scale(log_scale, 900):
+        assert point.Fs <= 102000
+        assert abs(point.generator_frequency / point.frequency - 1) < 0.5 / 900 + 1e-12
+
+        # Integer number of periods: the raw RMS is exact, no interpolation
+        t = np.arange(point.number_of_samples) / point.Fs
+        voltages = np.sin(2 * np.pi * point.generator_frequency * t + 0.7)
+
+        assert (
+            abs(
+                point.n_periods * point.Fs / point.generator_frequency
+                - point.number_of_samples
+            )
+            < 1e-6
+        )
+        assert abs(RMS.fft(voltages) - 1 / np.sqrt(2)) < 1e-9
+
+
+def test_missing():
+    log_scale = LogarithmicScale(10, 1000, 10)
+
+    assert np.all(log_scale.missing([]))
+
+    # Nudged frequencies of a coherent sweep still match, the gaps are missing
+    done = [f * (1 + 1e-3) for f in log_scale.f_list[:7]]
+    done = done[:3] + done[4:]
+    assert list(np.flatnonzero(log_scale.missing(done))) == [3] + list(
+        range(7, len(log_scale.f_list))
+    )
+    assert not np.any(log_scale.missing(log_scale.f_list))
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from audio.model.archive import SweepArchive
+from audio.model.capture import RawCapture
+from audio.model.sweep import POINT_STATUS, SweepData, SweepResult, SweepWriter
+from audio.sampling import SWEEP_COLUMNS, save_sweep_csv
+
+
+def test_archive_from_csv_tree(tmp_path):
+    rng = np.random.default_rng(0)
+    frequency = [10.0, 100.0, 1000.0]
+
+    for f in frequency:
+        point_dir = tmp_path / "sweep" / "{}".format(round(f, 5)).replace(".", "_", 1)
+        point_dir.mkdir(parents=True)
+
+        with open(point_dir / "sample.csv", "w", encoding="utf-8") as file:
+            file.write("# frequency: {}\n# Fs: {}\n".format(f, 10 * f))
+            pd.DataFrame(rng.normal(size=int(f))).to_csv(
+                file, header=["voltage"], index=None
+            )
+
+    data = pd.DataFrame(
+        [[f, 1, 0, 10 * f, 10, 90, 900, 0.1, 2.0] for f in frequency],
+        columns=SWEEP_COLUMNS,
+    )
+    save_sweep_csv(tmp_path / "sweep.csv", 2.0, data)
+
+    archive_file = SweepArchive.from_csv_tree(tmp_path / "sweep.csv")
+
+    with SweepArchive(archive_file) as archive:
+        assert len(archive) == 3
+        assert archive.amplitude == 2.0
+        assert archive.data.equals(SweepData(tmp_path / "sweep.csv").data)
+
+        point = archive.point(1)
+        assert (point.frequency, point.Fs) == (100.0, 1000.0)
+        assert len(point.voltages) == 100
+
+
+def test_archive_raw(tmp_path):
+    coefficients = np.array([0.001, 3.2e-4, 1e-12])
+    codes = (np.sin(np.linspace(0, 20, 1000)) * 30000).astype(np.int16)
+    capture = RawCapture(codes, coefficients)
+
+    volts = coefficients[0] + coefficients[1] * codes + coefficients[2] * codes**2.0
+    assert np.allclose(capture.voltages, volts)
+
+    archive_file = SweepArchive.write(
+        tmp_path / "sweep.npz",
+        pd.DataFrame({"frequency": [10.0], "rms": [1.0]}),
+        captures=[capture.codes],
+        capture_frequency=[10.0],
+        capture_Fs=[1000.0],
+        scaling_coefficients=coefficients,
+    )
+
+    with SweepArchive(archive_file) as archive:
+        assert archive.is_raw
+        assert archive.raw_capture(0).codes.dtype == np.int16
+        assert np.array_equal(archive.raw_capture(0).codes, codes)
+        assert np.allclose(archive.point(0).voltages.values, volts)
+
+
+def test_sweep_writer_resume(tmp_path):
+    path = tmp_path / "sweep.csv"
+
+    with SweepWriter(path, 2.0, SWEEP_COLUMNS) as writer:
+        writer.append([10.0, 1, 0, 100.0, 10, 90, 900, 0.1, 2.0])
+
+    # An interrupted sweep is continued without a second header
+    with SweepWriter(path, 2.0, SWEEP_COLUMNS, fsync_every=0, resume=True) as writer:
+        writer.append([20.0, 1, 0, 200.0, 10, 90, 900, 0.1, 2.5])
+
+    sweep_data = SweepData(path)
+    assert sweep_data.amplitude == 2.0
+    assert list(sweep_data.frequency) == [10.0, 20.0]
+    assert list(sweep_data.point_amplitude) == [2.0, 2.5]
+
+    # A new sweep overwrites the file
+    with SweepWriter(path, 3.0, SWEEP_COLUMNS) as writer:
+        writer.append([30.0, 1, 0, 300.0, 10, 90, 900, 0.1, 3.0])
+
+    sweep_data = SweepData(path)
+    assert sweep_data.amplitude == 3.0
+    assert list(sweep_data.frequency) == [30.0]
+
+    # A sweep without the column, all the points at the nominal amplitude
+    with SweepWriter(path, 3.0, SWEEP_COLUMNS[:-1]) as writer:
+        writer.append([30.0, 1, 0, 300.0, 10, 90, 900, 0.1])
+
+    assert list(SweepData(path).point_amplitude) == [3.0]
+
+
+def test_sweep_result():
+    result = SweepResult(3)
+
+    for index, frequency in enumerate([10.0, 100.0, 1000.0]):
+        result.set(index, frequency=frequency, fs=10 * frequency, n_samples=900)
+
+    result.set(0, rms=1.0)
+    result.set_status(0, POINT_STATUS.MEASURED)
+    result.set_status(1, POINT_STATUS.FAILED)
+    result.set(2, rms=3.0)
+    result.set_status(2, POINT_STATUS.MEASURED)
+
+    # The failed point doesn't shift the others
+    data = result.to_dataframe()
+    assert list(data["frequency"]) == [10.0, 1000.0]
+    assert list(data["rms"]) == [1.0, 3.0]
+    assert result.row(2)[SWEEP_COLUMNS.index("n_samples")] == 900
+
+    result.set_status(1, POINT_STATUS.MEASURED)
+    assert np.shares_memory(result.to_dataframe().values, result.column("rms"))
+
+
+def test_archive_raw_32_bit(tmp_path):
+    # A 24 bit ADC, e.g. the NI 9251, reads 32 bit raw samples
+    coefficients = np.array([0.0, 1e-7])
+    codes = (np.sin(np.linspace(0, 20, 1000)) * 2**23).astype(np.int32)
+
+    archive_file = SweepArchive.write(
+        tmp_path / "sweep.npz",
+        pd.DataFrame({"frequency": [10.0], "rms": [1.0]}),
+        captures=[RawCapture(codes, coefficients).codes],
+        capture_frequency=[10.0],
+        capture_Fs=[1000.0],
+        scaling_coefficients=coefficients,
+    )
+
+    with SweepArchive(archive_file) as archive:
+        assert archive.raw_capture(0).codes.dtype == np.int32
+        assert np.array_equal(archive.raw_capture(0).codes, codes)
+        assert np.allclose(archive.capture(0), codes * 1e-7)
+
+    with pytest.raises(ValueError):
+        RawCapture(codes.astype(np.float64), coefficients)
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from audio.model.catalog import Catalog, CatalogEntry, latest_sweep_dir
+
+
+def write_sweep(home, name, points):
+    sweep_dir = home / name
+    sweep_dir.mkdir()
+
+    measurements_file = sweep_dir / "sweep.csv"
+    measurements_file.write_text(
+        "# amplitude: 1.0\nfrequency,rms\n"
+        + "".join("{},1.0\n".format(10 * (i + 1)) for i in range(points))
+    )
+
+    return measurements_file
+
+
+def test_catalog(tmp_path):
+    first = write_sweep(tmp_path, "2023-01-01--10-00-000000", 3)
+    second = write_sweep(tmp_path, "2023-01-02--10-00-000000", 5)
+
+    catalog = Catalog(tmp_path)
+    assert catalog.latest() is None
+
+    catalog.add(
+        CatalogEntry.from_sweep(first, serial="A1", timestamp=datetime(2023, 1, 1))
+    )
+    catalog.add(
+        CatalogEntry.from_sweep(second, serial="B2", timestamp=datetime(2023, 1, 2))
+    )
+
+    # Persistent: a new instance reads the same file
+    catalog = Catalog(tmp_path)
+
+    assert catalog.latest().measurements_file == second
+    assert catalog.latest().points == 5
+    assert catalog.latest("A1").measurements_file == first
+    assert [e.points for e in catalog.by_serial("A1")] == [3]
+    assert len(catalog.between(datetime(2023, 1, 1, 12), None)) == 1
+    assert len(catalog.between(None, datetime(2023, 1, 3))) == 2
+
+    # The same sweep, e.g. resumed, is updated: not duplicated, same timestamp
+    catalog.add(CatalogEntry.from_sweep(first, serial="A1"))
+    assert len(catalog.between()) == 2
+    assert catalog.latest().measurements_file == second
+    assert catalog.latest("A1").timestamp == datetime(2023, 1, 1)
+    assert latest_sweep_dir(tmp_path) == second.parent
+
+
+def test_catalog_rebuild(tmp_path):
+    write_sweep(tmp_path, "2023-01-01--10-00-000000", 3)
+    latest = write_sweep(tmp_path, "2023-01-02--10-00-000000", 4)
+
+    assert latest_sweep_dir(tmp_path) == latest.parent
+
+    catalog = Catalog(tmp_path)
+    assert catalog.rebuild(tmp_path) == 2
+    assert catalog.latest().measurements_file == latest
+    assert catalog.latest().points == 4
+
+
+def test_latest_sweep_dir_not_catalogued(tmp_path):
+    first = write_sweep(tmp_path, "2023-01-01--10-00-000000", 3)
+    Catalog(tmp_path).add(
+        CatalogEntry.from_sweep(first, timestamp=datetime(2023, 1, 1, 10))
+    )
+
+    # A crashed sweep, newer and never catalogued
+    crashed = tmp_path / "2023-01-02--10-00-000000"
+    crashed.mkdir()
+    assert latest_sweep_dir(tmp_path) == crashed
+
+    # A sweep is catalogued when it starts, before its file exists
+    started = tmp_path / "2023-01-03--10-00-000000"
+    started.mkdir()
+    entry = CatalogEntry.from_sweep(started / "sweep.csv")
+    assert entry.points == 0
+
+    Catalog(tmp_path).add(entry)
+    assert latest_sweep_dir(tmp_path) == started
@@ -0,0 +1,29 @@
+import numpy as np
+from scipy import signal
+
+from audio.math.ess import ess_frequency_response, exponential_sine_sweep
+
+
+def test_ess_frequency_response():
+    Fs = 102000
+
+    reference = exponential_sine_sweep(10, 40000, 1, Fs) * 0.5
+
+    # Second order low pass as DUT, in steady state with the looped sweep
+    b, a = signal.butter(2, 5000 / (Fs / 2))
+    looped = signal.lfilter(b, a, np.tile(reference, 3))
+
+    # The capture starts anywhere in the loop
+    offset = len(reference) * 2 - 12345
+    response = looped[offset : offset + len(reference)]
+
+    # Second harmonic distortion must not change the linear response
+    response = response + 0.05 * response**2
+
+    frequencies = np.logspace(np.log10(20), np.log10(20000), 31)
+
+    gain = ess_frequency_response(response, reference, Fs, frequencies)
+
+    _, expected = signal.freqz(b, a, worN=frequencies, fs=Fs)
+
+    assert np.max(np.abs(20 * np.log10(gain / np.abs(expected)))) < 0.05
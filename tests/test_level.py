@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from audio.math.level import LevelSolver
+from audio.model.level import LevelCache, LevelEntry, LevelKey, LevelTable
+
+
+def test_level_solver_linear():
+    gain = 0.35
+    solver = LevelSolver(target=1.227653)
+
+    amplitude = 0.01
+    for _ in range(2):
+        amplitude = solver.next_amplitude(amplitude, gain * amplitude)
+
+    assert abs(gain * amplitude - 1.227653) < 1e-9
+
+
+def test_level_solver_compression():
+    # Soft clipping DUT: the linear prediction overshoots, the secant refines it
+    def dut(amplitude):
+        return 0.4 * amplitude / (1 + 0.05 * amplitude)
+
+    solver = LevelSolver(target=1.227653)
+
+    amplitude = 0.01
+    for iteration in range(solver.max_iterations):
+        rms = dut(amplitude)
+        if abs(rms - 1.227653) < 0.001:
+            break
+        amplitude = solver.next_amplitude(amplitude, rms)
+
+    assert iteration <= 4
+    assert abs(dut(amplitude) - 1.227653) < 0.001
+    assert 0.01 < amplitude < 10
+    assert solver.next_amplitude(amplitude, 0) is None
+
+
+def test_level_cache(tmp_path):
+    path = tmp_path / "level.json"
+    key = LevelKey("RIGOL,DG812,DG8A0001", "cDAQ1Mod1/ai1", 1000, 1.227653, "SN42")
+
+    cache = LevelCache(path)
+    assert cache.get(key) is None
+
+    cache.set(key, LevelEntry(3.5, 9.1))
+
+    cache = LevelCache(path)
+    assert cache.get(key).level_offset == 3.5
+    assert cache.get(key).gain_dB == 9.1
+
+    # Only the exact key: another generator, channel or DUT is a miss
+    for generator, channel, serial in [
+        ("RIGOL", key.channel, key.serial),
+        (key.generator, "cDAQ1Mod1/ai0", key.serial),
+        (key.generator, key.channel, None),
+    ]:
+        assert cache.get(LevelKey(generator, channel, 1000, 1.227653, serial)) is None
+
+    cache.set(key, LevelEntry(3.5, 9.1, datetime.now() - timedelta(hours=9)))
+    assert cache.get(key) is None
+    assert LevelCache(path, validity=timedelta(hours=10)).get(key) is not None
+
+
+def test_level_table(tmp_path):
+    frequency = [10, 100, 1000, 10000]
+    table = LevelTable(frequency, [2] * 4, [0.5, 0.7, 0.7, 0.35])
+
+    assert np.allclose(table.correction(frequency), [1.4, 1, 1, 2])
+    # Log frequency interpolation, constant outside the table
+    assert abs(table.correction(np.sqrt(10 * 100)) - 0.7 / 0.6) < 1e-12
+    assert table.correction(5) == table.correction(10)
+
+    # The corrected amplitudes give the level of the reference frequency
+    amplitude = 2 * table.correction(frequency)
+    assert np.allclose(table.expected_rms(frequency, amplitude), 0.7)
+
+    path = tmp_path / "level_table.csv"
+    table.to_csv(path)
+    loaded = LevelTable.from_csv(path)
+
+    assert np.allclose(loaded.correction(frequency), table.correction(frequency))
@@ -0,0 +1,82 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from audio.math import find_sin_zero_offset, rms_full_cycle, rms_prefixes
+from audio.math.decimation import min_max_decimate
+from audio.math.pid import PID_Controller, Timed_Value
+from audio.math.rms import RMS
+
+
+def test_find_sin_zero_offset_exact_zeros():
+    sample = np.round(np.sin(2 * np.pi * np.arange(100) / 16 + 0.3), 1)
+    sample[[0, 50]] = 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        trimmed, index_start, index_end = find_sin_zero_offset(sample)
+
+    assert (index_start, index_end) == (7, 87)
+    assert len(trimmed) == 80
+
+
+def test_rms_full_cycle():
+    sample = np.sin(2 * np.pi * np.arange(1000) / 100 - 0.01)
+
+    rms_list = rms_full_cycle(sample)
+
+    assert len(rms_list) == 9
+    assert np.allclose(rms_list, 1 / np.sqrt(2), atol=1e-9)
+
+
+def test_min_max_decimate():
+    x = np.arange(100_000) / 48000
+    y = np.sin(2 * np.pi * 50 * x)
+    y[12_345] = 3
+    y[54_321] = -2
+
+    x_decimated, y_decimated = min_max_decimate(x, y, 500)
+
+    assert len(y_decimated) <= 2 * 500 + 4
+    assert np.all(np.diff(x_decimated) > 0)
+    assert y_decimated.max() == 3 and y_decimated.min() == -2
+    assert x_decimated[0] == x[0] and x_decimated[-1] == x[-1]
+
+    # Few points for the width, nothing to decimate
+    x_same, y_same = min_max_decimate(x[:1000], y[:1000], 500)
+    assert len(y_same) == 1000
+
+
+def test_pid_incremental():
+    pid = PID_Controller(
+        set_point=1,
+        controller_gain=2,
+        tauI=0.5,
+        tauD=0.25,
+        controller_output_zero=0,
+    )
+
+    times = np.cumsum(np.linspace(0.1, 0.3, 200))
+    process_variable = 1 - np.exp(-times)
+
+    for time, value in zip(times, process_variable):
+        pid.add_process_variable(Timed_Value(value, time))
+        pid.add_error(Timed_Value(1 - value, time))
+
+    assert len(pid.error_list) == 200
+    assert abs(pid.error_integral - np.trapz(1 - process_variable, times)) < 1e-9
+    assert pid.derivative_term == pytest.approx(
+        -2 * 0.25 * np.diff(process_variable[-2:])[0] / np.diff(times[-2:])[0]
+    )
+
+
+def test_rms_prefixes():
+    rng = np.random.default_rng(0)
+    sample = rng.normal(0.2, 1, 301)
+    lengths = range(1, len(sample), 20)
+
+    assert np.allclose(
+        rms_prefixes(sample, lengths), [RMS.fft(sample[0:n]) for n in lengths]
+    )
+    assert len(rms_prefixes(sample[:3], range(5, 3, 5))) == 0
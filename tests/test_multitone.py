@@ -0,0 +1,50 @@
+import numpy as np
+from scipy import signal
+
+from audio.math import transfer_function
+from audio.math.algorithm import LogarithmicScale
+from audio.math.multitone import Multitone, group_frequencies, multitone_bins
+from audio.math.rms import RMS
+
+
+def test_group_frequencies():
+    f_list = LogarithmicScale(20, 20000, 50).f_list
+    groups = group_frequencies(f_list, 16)
+
+    assert len(groups) == int(np.ceil(len(f_list) / 16))
+    assert sorted(f for group in groups for f in group) == sorted(f_list)
+
+
+def test_multitone_bins_unique_and_no_harmonics():
+    bins = multitone_bins([100, 100.2, 200, 300], 10000, 10000)
+
+    assert len(set(bins)) == len(bins)
+    for b in bins:
+        assert 2 * b not in bins[bins > b]
+        assert 3 * b not in bins[bins > b]
+
+
+def test_multitone_frequency_response():
+    Fs = 10000
+    N = 10000
+
+    multitone = Multitone.from_frequencies(
+        LogarithmicScale(20, 2000, 5).f_list, Fs, N
+    )
+
+    waveform = multitone.waveform()
+    assert np.max(np.abs(waveform)) == 1
+
+    # Low pass DUT, in steady state with the looped multitone
+    b, a = signal.butter(2, 500 / (Fs / 2))
+    response = signal.lfilter(b, a, np.tile(waveform, 4))[2 * N + 123 : 3 * N + 123]
+
+    input_rms = multitone.amplitude / np.sqrt(2)
+    gain_dB = [
+        transfer_function(rms, input_rms)
+        for rms in RMS.fft_bins(response, multitone.bins)
+    ]
+
+    _, expected = signal.freqz(b, a, worN=multitone.frequencies, fs=Fs)
+
+    assert np.max(np.abs(np.array(gain_dB) - 20 * np.log10(np.abs(expected)))) < 1e-6
@@ -0,0 +1,72 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+from audio.config.plot import PlotConfigXML
+from audio.sampling import plot_all, plot_from_csv
+
+
+def write_sweep(path, offset=0):
+    frequency = np.logspace(1, 4, 30)
+
+    path.write_text(
+        "# amplitude: 1.0\nfrequency,rms,dBV,fs\n"
+        + "".join(
+            "{},1.0,{},{}\n".format(f, offset - 0.01 * i, 10 * f)
+            for i, f in enumerate(frequency)
+        )
+    )
+
+
+def test_plot_from_csv_formats(tmp_path):
+    measurements_file = tmp_path / "sweep.csv"
+    write_sweep(measurements_file)
+
+    plot_files = plot_from_csv(
+        measurements_file,
+        measurements_file.with_suffix(""),
+        PlotConfigXML.from_values(dpi=20),
+        formats=["png", "pdf"],
+        parallel=True,
+    )
+
+    assert plot_files == [tmp_path / "sweep.png", tmp_path / "sweep.pdf"]
+    assert all(file.stat().st_size > 0 for file in plot_files)
+
+
+def test_plot_from_csv_preview(tmp_path):
+    measurements_file = tmp_path / "sweep.csv"
+    write_sweep(measurements_file)
+
+    (plot_file,) = plot_from_csv(
+        measurements_file,
+        tmp_path / "sweep.preview.png",
+        PlotConfigXML.from_values(),
+        preview=True,
+    )
+
+    # 32x18 inches at 300 dpi in full, 8x4.5 inches at 72 dpi as a draft
+    assert plt.imread(plot_file).shape[:2] == (324, 576)
+
+
+def test_plot_all_skips_unchanged(tmp_path):
+    measurements_files = []
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        measurements_files.append(tmp_path / name / "sweep.csv")
+        write_sweep(measurements_files[-1])
+
+    plot_config = PlotConfigXML.from_values(dpi=20)
+
+    plotted, skipped, failed = plot_all(
+        measurements_files, plot_config, ["png"], workers=2
+    )
+    assert (len(plotted), len(skipped), len(failed)) == (2, 0, 0)
+    assert (tmp_path / "a" / "sweep.png").exists()
+
+    # Only the changed csv is plotted again
+    write_sweep(measurements_files[0], offset=1)
+    plotted, skipped, failed = plot_all(
+        measurements_files, plot_config, ["png"], workers=2
+    )
+    assert plotted == [measurements_files[0]]
+    assert skipped == [measurements_files[1]]
@@ -0,0 +1,87 @@
+import numpy as np
+
+from audio.math.rms import RMS, RMS_MODE
+
+
+def test_fft_parseval():
+    rng = np.random.default_rng(0)
+
+    for n_samp in (200, 201):
+        matrix = rng.normal(0.3, 1, size=(16, n_samp))
+        expected = np.sqrt(np.mean(np.square(matrix), axis=1))
+
+        assert np.allclose(RMS.fft_batch(matrix), expected)
+        assert abs(RMS.fft(matrix[0]) - expected[0]) < 1e-12
+
+
+def test_fft_bins():
+    n_samp = 256
+    t = np.arange(n_samp)
+    voltages = 2 * np.cos(2 * np.pi * 5 * t / n_samp) + np.cos(np.pi * t)
+
+    assert np.allclose(RMS.fft_bins(voltages, [5, 7, 128]), [np.sqrt(2), 0, 1])
+
+
+def test_sine_fit():
+    Fs = 48000
+    t = np.arange(500) / Fs
+    voltages = 0.3 + 1.7 * np.sin(2 * np.pi * 1003.3 * t + 0.4)
+
+    # 10.45 periods, no trimming needed
+    fit = RMS.sine_fit(voltages, 1003.3, Fs)
+    assert abs(fit.rms - 1.7 / np.sqrt(2)) < 1e-9
+    assert abs(fit.offset - 0.3) < 1e-9
+    assert fit.residual < 1e-9
+
+    fit = RMS.sine_fit(voltages, 1000, Fs, refine_frequency=True)
+    assert abs(fit.frequency - 1003.3) < 1e-6
+    assert abs(fit.phase - 0.4) < 1e-6
+    assert abs(fit.rms - 1.7 / np.sqrt(2)) < 1e-9
+
+
+def test_goertzel():
+    Fs = 48000
+    t = np.arange(960) / Fs
+    rng = np.random.default_rng(0)
+
+    voltages = np.sin(2 * np.pi * 1000 * t + 0.3)
+
+    assert abs(RMS.goertzel(voltages, 1000, Fs) - 1 / np.sqrt(2)) < 1e-12
+    assert abs(RMS.goertzel(voltages, 1000, Fs, "hann") - 1 / np.sqrt(2)) < 1e-12
+
+    # The noise outside the bin is rejected
+    noisy = voltages + rng.normal(0, 0.3, len(t))
+    assert abs(RMS.goertzel(noisy, 1000, Fs) - 1 / np.sqrt(2)) < 0.02
+    assert RMS.fft(noisy) - 1 / np.sqrt(2) > 0.04
+
+
+def test_goertzel_non_coherent():
+    Fs = 48000
+    t = np.arange(500) / Fs
+
+    # 10.45 periods: the leakage is windowed away, not trimmed
+    for phase in np.linspace(0, np.pi, 7):
+        voltages = np.sin(2 * np.pi * 1003.3 * t + phase)
+
+        rms = RMS.rms_from_voltages(
+            voltages, 1003.3, Fs, rms_mode=RMS_MODE.GOERTZEL, trim=True
+        )
+        assert abs(rms * np.sqrt(2) - 1) < 1e-4
+
+
+def test_goertzel_batch():
+    Fs = 48000
+    t = np.arange(500) / Fs
+    rng = np.random.default_rng(0)
+
+    matrix = np.array(
+        [a * np.sin(2 * np.pi * 1003.3 * t + a) for a in (1, 2, 3)]
+    ) + rng.normal(0, 0.1, (3, len(t)))
+
+    for window in (None, "hann"):
+        batch = RMS.goertzel(matrix, 1003.3, Fs, window)
+
+        assert batch.shape == (3,)
+        assert np.allclose(
+            batch, [RMS.goertzel(row, 1003.3, Fs, window) for row in matrix]
+        )
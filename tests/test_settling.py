@@ -0,0 +1,75 @@
+import numpy as np
+
+from audio.math import settling
+from audio.math.settling import SettlingDetector, block_rms
+
+
+def sine_block(amplitude: float, frequency: float, Fs: float, n: int, phase: float):
+    t = np.arange(n) / Fs
+    return amplitude * np.sin(2 * np.pi * frequency * t + phase)
+
+
+def test_block_rms_non_integer_cycles():
+    # 3.7 cycles, the fit must not depend on the cut of the last period
+    voltages = sine_block(1.0, 1000, 48000, int(3.7 * 48), 0.3) + 0.1
+
+    assert abs(block_rms(voltages, 1000, 48000) - 1 / np.sqrt(2)) < 1e-9
+
+
+def test_settling_detector_settles():
+    frequency = 1000
+    Fs = 48000
+    detector = SettlingDetector(tolerance=0.001, timeout=10)
+    n = detector.block_size(frequency, Fs)
+
+    # Amplitude of the DUT output settling exponentially
+    amplitudes = iter([1 - np.exp(-k) for k in range(1, 50)])
+
+    result = detector.wait(
+        lambda: sine_block(next(amplitudes), frequency, Fs, n, 0),
+        frequency=frequency,
+        Fs=Fs,
+    )
+
+    assert result.settled
+    assert len(result.rms_list) < 10
+    assert abs(result.rms * np.sqrt(2) - 1) < 0.002
+
+
+def test_settling_detector_timeout():
+    detector = SettlingDetector(tolerance=0.001, timeout=0)
+    rng = np.random.default_rng(0)
+
+    result = detector.wait(
+        lambda: sine_block(rng.uniform(0.5, 1.5), 100, 10000, 400, 0),
+        frequency=100,
+        Fs=10000,
+    )
+
+    # Two blocks at least, or there is nothing to compare
+    assert not result.settled
+    assert len(result.rms_list) == 2
+
+
+def test_settling_detector_low_frequency(monkeypatch):
+    frequency = 10
+    Fs = 1000
+    detector = SettlingDetector(tolerance=0.001)
+    n = detector.block_size(frequency, Fs)
+
+    # 4 cycles at 10 Hz are the whole timeout, the block is shorter
+    assert n / Fs <= detector.timeout / 4
+
+    # Fake clock, every block takes its duration
+    now = [0.0]
+    monkeypatch.setattr(settling.time, "perf_counter", lambda: now[0])
+
+    def read_block():
+        now[0] += n / Fs
+        return sine_block(1.0, frequency, Fs, n, 0)
+
+    result = detector.wait(read_block, frequency=frequency, Fs=Fs)
+
+    assert result.settled
+    assert len(result.rms_list) == 2
+    assert result.settle_time < detector.timeout
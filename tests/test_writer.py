@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from audio.model.sweep import SingleSweepData
+from audio.model.writer import CaptureWriter, CaptureWriterError
+
+
+def test_capture_writer(tmp_path):
+    voltages = np.sin(np.arange(100) / 10)
+
+    with CaptureWriter(max_pending=2) as writer:
+        for index in range(10):
+            writer.write(tmp_path / f"{index}" / "sample.csv", voltages, 10.0, 100.0)
+
+    data = SingleSweepData(tmp_path / "9" / "sample.csv")
+    assert (data.frequency, data.Fs) == (10.0, 100.0)
+    assert np.allclose(data.voltages.values, voltages)
+
+
+def test_capture_writer_errors(tmp_path):
+    (tmp_path / "file").write_text("")
+
+    writer = CaptureWriter()
+    writer.write(tmp_path / "file" / "sample.csv", np.zeros(10), 10.0, 100.0)
+    writer.write(tmp_path / "ok" / "sample.csv", np.zeros(10), 10.0, 100.0)
+
+    with pytest.raises(CaptureWriterError) as error:
+        writer.close()
+
+    assert len(error.value.errors) == 1
+    assert (tmp_path / "ok" / "sample.csv").exists()